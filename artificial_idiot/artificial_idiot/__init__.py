@@ -31,6 +31,10 @@ defensive_weights = [1000, -10, 1, -5, 49, 200, 100, 0, 5, -5]
 evaluator_generator = MinimaxEvaluator(defensive_weights)
 defensive_search = AlphaBetaSearch(evaluator_generator, cutoff)
 
+# Once a colour is eliminated, race the remaining player
+evaluator_generator = MinimaxEvaluator(aggressive_weights)
+two_player_search = NegamaxSearch(evaluator_generator, cutoff)
+
 
 cutoff = DepthLimitCutoff(2)
 # When time runs out, reduce the depth
@@ -46,7 +50,8 @@ simple_defensive_search = AlphaBetaSearch(evaluator_generator, cutoff)
 composite_search = CompositionSearch(open_book, aggressive_search,
                                      defensive_search,
                                      simple_aggressive_search,
-                                     simple_defensive_search)
+                                     simple_defensive_search,
+                                     two_player_search)
 
 mix = PlayerFactory.get_type_factory(Player)(
     search_algorithm=composite_search,
@@ -1,6 +1,6 @@
 import abc
 import numpy as np
-from math import log
+from math import log, exp
 from functools import lru_cache
 from copy import copy
 
@@ -364,6 +364,60 @@ class FunctionalEvaluatorGenerator(EvaluatorGenerator):
         return FunctionalEvaluator(state, self._weights, self._functions)
 
 
+class ConstantSumEvaluator:
+    """
+    Shares of the players, each in [0, 1] and summing up to 1.
+    A player that has won gets all of it, otherwise the shares are the
+    softmax of the values of an evaluator.
+    """
+    players = ("red", "green", "blue")
+
+    def __init__(self, state, evaluator, temperature):
+        self._state = state
+        self._evaluator = evaluator
+        self._temperature = temperature
+        self._value = None
+
+    def _shares(self):
+        completed = self._state.completed
+        for player in self.players:
+            if completed.get(player, 0) == NEEDED:
+                return {p: float(p == player) for p in self.players}
+        values = {player: self._evaluator(player) / self._temperature
+                  for player in self.players}
+        highest = max(values.values())
+        weights = {player: exp(value - highest)
+                   for player, value in values.items()}
+        total = sum(weights.values())
+        return {player: weight / total for player, weight in weights.items()}
+
+    def __call__(self, player):
+        if self._value is None:
+            self._value = self._shares()
+        return self._value[player]
+
+
+class ConstantSumEvaluatorGenerator(EvaluatorGenerator):
+    """
+    Bounded and constant sum version of another evaluator, as needed to
+    prune MaxN (max_sum = 1)
+    """
+    def __init__(self, evaluator_generator, temperature=100, *args,
+                 **kwargs):
+        """
+        :param evaluator_generator: the evaluator to bound
+        :param temperature: difference in value that makes the share of a
+            player e times bigger than another one
+        """
+        self._evaluator_generator = evaluator_generator
+        self._temperature = temperature
+        super().__init__(*args, **kwargs)
+
+    def __call__(self, state, *args, **kwargs):
+        return ConstantSumEvaluator(state, self._evaluator_generator(state),
+                                    self._temperature)
+
+
 class NaiveEvaluatorGenerator(EvaluatorGenerator):
     """
     * weights are defined beforehand
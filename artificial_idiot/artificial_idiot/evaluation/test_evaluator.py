@@ -49,3 +49,33 @@ class TestNaiveEvaluator(TestCase):
 
 
 
+
+
+class TestConstantSumEvaluator(TestCase):
+    evaluator_generator = ConstantSumEvaluatorGenerator(
+        NaiveEvaluatorGenerator([10, 100, 1]))
+
+    def test_bounded(self):
+        for file_name in ("red_initial_state", "eat_green", "busy"):
+            state = parse_state(f"../../tests/{file_name}.json")
+            evaluator = self.evaluator_generator(state)
+            shares = [evaluator(player) for player in ("red", "green", "blue")]
+            for share in shares:
+                self.assertGreaterEqual(share, 0)
+                self.assertLessEqual(share, 1)
+            self.assertAlmostEqual(1, sum(shares))
+
+    def test_same_order(self):
+        state = parse_state("../../tests/eat_green.json")
+        values = NaiveEvaluatorGenerator([10, 100, 1])(state)
+        shares = self.evaluator_generator(state)
+        self.assertEqual(values("red") > values("green"),
+                         shares("red") > shares("green"))
+
+    def test_win(self):
+        state = parse_state("../../tests/red_initial_state.json")
+        state = State(state.pos_to_piece, "red", {"red": 4, "green": 0,
+                                                   "blue": 0})
+        evaluator = self.evaluator_generator(state)
+        self.assertEqual(1, evaluator("red"))
+        self.assertEqual(0, evaluator("green"))
@@ -2,3 +2,5 @@ from artificial_idiot.game import game
 from artificial_idiot.game import node
 from artificial_idiot.game import state
 
+from artificial_idiot.game import bitboard
+from artificial_idiot.game import tree_arena
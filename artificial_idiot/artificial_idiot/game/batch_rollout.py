@@ -0,0 +1,163 @@
+"""
+Random playouts of many games at once with NumPy.
+
+The boards are a (B, 38) int8 array: the 37 cells in the order of
+bitboard.CELLS hold the colour code of their piece or EMPTY, and the extra
+column 38 is a WALL that every off-board neighbour points to. Every ply, the
+legal actions of the pieces to move of all boards are found with the
+precomputed neighbour and jump indices as a (pieces, 13) mask (6 moves,
+6 jumps and the exit), one is sampled per board and all of them are applied
+together.
+"""
+
+import numpy as np
+from artificial_idiot.game.game import Game
+from artificial_idiot.game.state import CODE_MAP, REV_CODE_MAP
+from artificial_idiot.game.bitboard import CELLS, BitboardState, cell_index
+
+EMPTY = -1
+WALL_VALUE = 3
+N_CELLS = len(CELLS)
+WALL = N_CELLS
+N_DIRECTIONS = len(Game.moves)
+# moves, jumps and exit of a cell
+N_KINDS = 2 * N_DIRECTIONS + 1
+EXIT_KIND = 2 * N_DIRECTIONS
+
+_cell_to_index = {pos: i for i, pos in enumerate(CELLS)}
+# cell -> cell one and two steps away in every direction, WALL if off board
+NEIGHBOURS = np.full((N_CELLS + 1, N_DIRECTIONS), WALL, np.intp)
+JUMPS = np.full((N_CELLS + 1, N_DIRECTIONS), WALL, np.intp)
+for _i, (_q, _r) in enumerate(CELLS):
+    for _d, (_dq, _dr) in enumerate(Game.moves):
+        NEIGHBOURS[_i, _d] = _cell_to_index.get((_q + _dq, _r + _dr), WALL)
+        JUMPS[_i, _d] = _cell_to_index.get((_q + 2 * _dq, _r + 2 * _dr),
+                                           WALL)
+# colour code -> cells a piece can exit from
+EXITS = np.zeros((3, N_CELLS), bool)
+for _colour, _positions in Game.exit_positions.items():
+    for _pos in _positions:
+        EXITS[CODE_MAP[_colour], _cell_to_index[_pos]] = True
+# bit of every cell in a bitboard
+CELL_BITS = np.array([1 << cell_index(pos) for pos in CELLS], np.uint64)
+
+
+class BatchRollout:
+    """
+    Plays batch_size uniformly random games from the same state until each
+    of them ends or max_depth actions have been played.
+    """
+
+    def __init__(self, batch_size=64, max_depth=-1, rng=None):
+        """
+        :param batch_size: number of games played together
+        :param max_depth: maximum number of actions of a game, -1 to play
+            all of them to the end
+        :param rng: numpy Generator, a new one by default
+        """
+        self.batch_size = batch_size
+        self.max_depth = max_depth
+        self.rng = rng if rng is not None else np.random.default_rng()
+        # the arrays of the last batch
+        self.boards = None
+        self.colours = None
+        self.exited = None
+
+    def reset(self, state):
+        """
+        Fill every game of the batch with a state
+        """
+        board = np.full(N_CELLS + 1, EMPTY, np.int8)
+        board[WALL] = WALL_VALUE
+        for pos, colour in state.pos_to_piece.items():
+            board[_cell_to_index[pos]] = CODE_MAP[colour]
+        exited = [state.completed.get(colour, 0) for colour in CODE_MAP]
+        self.boards = np.tile(board, (self.batch_size, 1))
+        self.colours = np.full(self.batch_size, CODE_MAP[state.colour],
+                               np.int8)
+        self.exited = np.tile(np.array(exited, np.int8),
+                              (self.batch_size, 1))
+
+    def step(self, games):
+        """
+        Play one random action in each of the games
+        :param games: indices of the games in the batch
+        """
+        boards = self.boards[games]
+        colours = self.colours[games]
+        # pieces of the player to move, grouped by game
+        rows, cells = np.nonzero(boards[:, :N_CELLS] == colours[:, None])
+        step = boards[rows[:, None], NEIGHBOURS[cells]]
+        jump = boards[rows[:, None], JUMPS[cells]]
+        legal = np.empty((len(rows), N_KINDS), bool)
+        legal[:, :N_DIRECTIONS] = step == EMPTY
+        legal[:, N_DIRECTIONS:EXIT_KIND] = \
+            (step >= 0) & (step < WALL_VALUE) & (jump == EMPTY)
+        legal[:, EXIT_KIND] = EXITS[colours[rows], cells]
+
+        # a uniform choice among the legal actions of each game, as an index
+        # into the legal actions of all games in row order
+        counts = np.bincount(rows, legal.sum(axis=1),
+                             len(games)).astype(np.intp)
+        # the other games pass
+        moving = counts > 0
+        counts = counts[moving]
+        starts = np.cumsum(counts) - counts
+        picks = starts + (self.rng.random(len(counts)) * counts).astype(np.intp)
+        pieces, kinds = np.divmod(np.flatnonzero(legal)[picks], N_KINDS)
+        games = games[moving]
+        colours = colours[moving]
+        cells = cells[pieces]
+        directions = kinds % N_DIRECTIONS
+
+        self.boards[games, cells] = EMPTY
+        is_move = kinds < N_DIRECTIONS
+        self.boards[games[is_move], NEIGHBOURS[cells[is_move],
+                                               directions[is_move]]] = \
+            colours[is_move]
+        is_jump = (kinds >= N_DIRECTIONS) & (kinds < EXIT_KIND)
+        jumping = games[is_jump]
+        self.boards[jumping, JUMPS[cells[is_jump], directions[is_jump]]] = \
+            colours[is_jump]
+        # the jumped over piece becomes the colour of the jumping one
+        self.boards[jumping, NEIGHBOURS[cells[is_jump],
+                                        directions[is_jump]]] = \
+            colours[is_jump]
+        is_exit = kinds == EXIT_KIND
+        self.exited[games[is_exit], colours[is_exit]] += 1
+
+    def run(self, state, max_depth=None):
+        """
+        Play the batch from a state
+        :param max_depth: maximum number of actions of a game, the one of
+            the rollout by default
+        :return: the final BitboardState of every game
+        """
+        if max_depth is None:
+            max_depth = self.max_depth
+        self.reset(state)
+        playing = np.ones(self.batch_size, bool)
+        depth = 0
+        while depth != max_depth:
+            playing &= self.exited.max(axis=1) < 4
+            games = np.flatnonzero(playing)
+            if not len(games):
+                break
+            self.step(games)
+            self.colours[games] = (self.colours[games] + 1) % 3
+            depth += 1
+        return self.states()
+
+    def states(self):
+        """
+        :return: BitboardState of every game of the batch
+        """
+        boards = np.stack(
+            [np.where(self.boards[:, :N_CELLS] == code, CELL_BITS,
+                      np.uint64(0)).sum(axis=1, dtype=np.uint64)
+             for code in range(3)], axis=1)
+        return [BitboardState(tuple(int(board) for board in game_boards),
+                              REV_CODE_MAP[int(colour)],
+                              tuple(int(n) for n in exited))
+                for game_boards, colour, exited
+                in zip(boards, self.colours, self.exited)]
@@ -0,0 +1,483 @@
+"""
+Bitboard representation of the Chexers board.
+
+Every hex (q, r) is mapped to bit (q + 3) * 8 + (r + 3). Each column of the
+board is 8 bits wide while only 7 of them can ever be on the board, so the
+spare bit of a column acts as padding: a single step in any of the six
+directions is a constant shift, and anything that falls off the board lands
+either on a padding bit or outside the 56 bit window, which are all removed
+by masking with BOARD.
+"""
+
+from collections import defaultdict
+from functools import lru_cache
+from random import random, randrange
+from artificial_idiot.game.state import State, CODE_MAP, REV_CODE_MAP
+from artificial_idiot.game.game import Game, NodeGame, PASS_ACTION
+from artificial_idiot.game.node import Node
+
+
+WIDTH = 8
+
+CELLS = tuple((q, r) for q in range(-3, 4) for r in range(-3, 4)
+              if abs(q + r) <= 3)
+
+
+def cell_index(pos):
+    q, r = pos
+    return (q + 3) * WIDTH + (r + 3)
+
+
+# bit index -> (q, r) and (q, r) -> bit index
+INDEX_TO_CELL = {cell_index(pos): pos for pos in CELLS}
+CELL_TO_INDEX = {pos: i for i, pos in INDEX_TO_CELL.items()}
+
+BOARD = 0
+for _pos in CELLS:
+    BOARD |= 1 << cell_index(_pos)
+
+# shift for every direction, in the same order of forwardness as Game.moves
+SHIFTS = tuple(dq * WIDTH + dr for dq, dr in Game.moves)
+
+# shifts in the order of forwardness of every colour, indexed by colour code.
+# The first FORWARD_DIRECTIONS of them get a piece closer to its exits
+COLOUR_SHIFTS = tuple(
+    tuple(dq * WIDTH + dr for dq, dr in
+          (State.rotate_pos("red", REV_CODE_MAP[i], move)
+           for move in Game.moves))
+    for i in range(3)
+)
+FORWARD_DIRECTIONS = 2
+
+# Exit masks indexed by colour code
+EXIT_MASKS = tuple(
+    sum(1 << cell_index(pos) for pos in Game.exit_positions[REV_CODE_MAP[i]])
+    for i in range(3)
+)
+
+# Pre-built actions so that move generation only indexes into tables.
+# All of them are keyed by the bit of the destination (exit: origin) cell
+EXIT_ACTIONS = {1 << i: (pos, None, "EXIT")
+                for i, pos in INDEX_TO_CELL.items()}
+# shift -> {destination bit -> action}
+STEP_ACTIONS = {
+    n: {1 << i: (INDEX_TO_CELL[i - n], INDEX_TO_CELL[i], "MOVE")
+        for i in INDEX_TO_CELL if i - n in INDEX_TO_CELL}
+    for n in SHIFTS
+}
+JUMP_ACTIONS = {
+    n: {1 << i: (INDEX_TO_CELL[i - 2 * n], INDEX_TO_CELL[i], "JUMP")
+        for i in INDEX_TO_CELL
+        if i - 2 * n in INDEX_TO_CELL and i - n in INDEX_TO_CELL}
+    for n in SHIFTS
+}
+
+# action -> (origin bit, destination bit, jumped over bit)
+ACTION_MASKS = {PASS_ACTION: (0, 0, 0)}
+for _action in EXIT_ACTIONS.values():
+    ACTION_MASKS[_action] = (1 << cell_index(_action[0]), 0, 0)
+for _n in SHIFTS:
+    for _action in STEP_ACTIONS[_n].values():
+        ACTION_MASKS[_action] = (1 << cell_index(_action[0]),
+                                 1 << cell_index(_action[1]), 0)
+    for _action in JUMP_ACTIONS[_n].values():
+        _fr, _to = cell_index(_action[0]), cell_index(_action[1])
+        ACTION_MASKS[_action] = (1 << _fr, 1 << _to, 1 << (_fr + _to) // 2)
+
+# (origin bit, destination bit) -> action, the inverse of ACTION_MASKS
+BIT_ACTIONS = {(fr, to): action for action, (fr, to, _)
+               in ACTION_MASKS.items() if action != PASS_ACTION}
+
+# Replace the item of a colour in a tuple indexed by colour code
+WITH_CODE = (
+    lambda items, value: (value, items[1], items[2]),
+    lambda items, value: (items[0], value, items[2]),
+    lambda items, value: (items[0], items[1], value),
+)
+
+NEXT_COLOUR = {colour: State.next_colour(colour) for colour in CODE_MAP}
+
+
+def bits(board):
+    """
+    Yield the index of every set bit of a board
+    """
+    while board:
+        low = board & -board
+        yield low.bit_length() - 1
+        board ^= low
+
+
+class BitboardState(State):
+    """
+    A state that stores the board as one occupancy mask per colour and the
+    number of exited pieces as a tuple, both indexed by colour code.
+    The dictionary views used by the evaluators (pos_to_piece, piece_to_pos,
+    completed) are only built when requested.
+    """
+    # Lazily computed views, shadowed per instance once computed
+    _pos_cache = None
+    _piece_to_pos = None
+    _completed = None
+    _hash = None
+
+    def __init__(self, boards, colour, completed=(0, 0, 0)):
+        """
+        :param boards: tuple of three occupancy masks (red, green, blue)
+        :param colour: string that represent the current player
+        :param completed: tuple of number of exited pieces per colour
+        """
+        self._colour = colour
+        self.boards = boards
+        self.exited = completed
+
+    @classmethod
+    def from_state(cls, state):
+        boards = [0, 0, 0]
+        for pos, colour in state.pos_to_piece.items():
+            boards[cls.code_map[colour]] |= 1 << cell_index(pos)
+        completed = tuple(state.completed.get(REV_CODE_MAP[i], 0)
+                          for i in range(3))
+        return cls(tuple(boards), state.colour, completed)
+
+    def to_state(self):
+        return State(self.pos_to_piece, self.colour, dict(self.completed))
+
+    @property
+    def occupancy(self):
+        red, green, blue = self.boards
+        return red | green | blue
+
+    @property
+    def _pos_to_piece(self):
+        if self._pos_cache is None:
+            self._pos_cache = {
+                INDEX_TO_CELL[i]: REV_CODE_MAP[code]
+                for code, board in enumerate(self.boards)
+                for i in bits(board)
+            }
+        return self._pos_cache
+
+    @property
+    def completed(self):
+        if self._completed is None:
+            self._completed = {REV_CODE_MAP[i]: n
+                               for i, n in enumerate(self.exited)}
+        return self._completed
+
+    @property
+    def remaining_colours(self):
+        return {REV_CODE_MAP[i] for i, board in enumerate(self.boards)
+                if board}
+
+    def occupied(self, pos):
+        return bool(self.occupancy >> cell_index(pos) & 1)
+
+    def piece_at_pos(self, pos):
+        i = cell_index(pos)
+        for code, board in enumerate(self.boards):
+            if board >> i & 1:
+                return REV_CODE_MAP[code]
+        return None
+
+    @property
+    def key(self):
+        return hash(self)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash((self.boards, self._colour, self.exited))
+        return self._hash
+
+    def __eq__(self, other):
+        return (isinstance(other, BitboardState) and
+                self.boards == other.boards and
+                self._colour == other._colour and
+                self.exited == other.exited)
+
+
+class BitboardGame(Game):
+    """
+    Game rules over BitboardState. Actions are produced in the same format as
+    Game so that it can be used in place of Game by any search.
+    """
+
+    def __init__(self, colour, state):
+        if isinstance(state, State) and not isinstance(state, BitboardState):
+            state = BitboardState.from_state(state)
+        super().__init__(colour, state)
+
+    @classmethod
+    @lru_cache(10000)
+    def actions(cls, state):
+        """
+        Same as Game.actions, but every direction is generated for all pieces
+        at once with a shift of the occupancy masks
+        """
+        actions = []
+        if max(state.exited) == 4:
+            return actions
+
+        code = CODE_MAP[state._colour]
+        boards = state.boards
+        own = boards[code]
+        occupied = boards[0] | boards[1] | boards[2]
+        empty = BOARD & ~occupied
+
+        ready = own & EXIT_MASKS[code]
+        while ready:
+            low = ready & -ready
+            actions.append(EXIT_ACTIONS[low])
+            ready ^= low
+
+        for n in SHIFTS:
+            step = (own << n if n > 0 else own >> -n) & BOARD
+            step_actions = STEP_ACTIONS[n]
+            moves = step & empty
+            while moves:
+                low = moves & -moves
+                actions.append(step_actions[low])
+                moves ^= low
+            jump_actions = JUMP_ACTIONS[n]
+            jumps = step & occupied
+            jumps = (jumps << n if n > 0 else jumps >> -n) & empty
+            while jumps:
+                low = jumps & -jumps
+                actions.append(jump_actions[low])
+                jumps ^= low
+
+        return actions if len(actions) > 0 else [PASS_ACTION]
+
+    def result(self, state, action):
+        """
+        Apply the precomputed masks of an action to the boards of the mover
+        """
+        colour = state._colour
+        fr_bit, to_bit, mid_bit = ACTION_MASKS[action]
+        code = CODE_MAP[colour]
+        completed = state.exited
+        boards = state.boards
+        if mid_bit:
+            boards = tuple(board & ~mid_bit for board in boards)
+        elif fr_bit and not to_bit:
+            completed = WITH_CODE[code](completed, completed[code] + 1)
+        boards = WITH_CODE[code](boards,
+                                 boards[code] ^ (fr_bit | to_bit) | mid_bit)
+        return state.__class__(boards, NEXT_COLOUR[colour], completed)
+
+    def successors(self, state):
+        """
+        Same as Game.successors, but the child boards are built directly from
+        the shifted masks instead of going through result
+        """
+        colour = state._colour
+        completed = state.exited
+        if max(completed) == 4:
+            return []
+        code = CODE_MAP[colour]
+        with_code = WITH_CODE[code]
+        next_colour = NEXT_COLOUR[colour]
+        cls = state.__class__
+        boards = state.boards
+        own = boards[code]
+        occupied = boards[0] | boards[1] | boards[2]
+        empty = BOARD & ~occupied
+        children = []
+
+        ready = own & EXIT_MASKS[code]
+        if ready:
+            exited = with_code(completed, completed[code] + 1)
+        while ready:
+            low = ready & -ready
+            children.append((EXIT_ACTIONS[low],
+                             cls(with_code(boards, own ^ low),
+                                 next_colour, exited)))
+            ready ^= low
+
+        for n in SHIFTS:
+            step = (own << n if n > 0 else own >> -n) & BOARD
+            step_actions = STEP_ACTIONS[n]
+            moves = step & empty
+            while moves:
+                low = moves & -moves
+                fr = low >> n if n > 0 else low << -n
+                children.append((step_actions[low],
+                                 cls(with_code(boards, own ^ fr ^ low),
+                                     next_colour, completed)))
+                moves ^= low
+            jump_actions = JUMP_ACTIONS[n]
+            jumps = step & occupied
+            jumps = (jumps << n if n > 0 else jumps >> -n) & empty
+            while jumps:
+                low = jumps & -jumps
+                if n > 0:
+                    mid = low >> n
+                    fr = mid >> n
+                else:
+                    mid = low << -n
+                    fr = mid << -n
+                captured = tuple(board & ~mid for board in boards)
+                children.append((jump_actions[low],
+                                 cls(with_code(captured,
+                                               own ^ fr ^ low | mid),
+                                     next_colour, completed)))
+                jumps ^= low
+
+        if not children:
+            children.append((PASS_ACTION, cls(boards, next_colour, completed)))
+        return children
+
+    @staticmethod
+    def jump_action_classification(state, action):
+        fr, to, type = action
+        if type != "JUMP":
+            return None
+        fr_i = CELL_TO_INDEX[fr]
+        mid = (fr_i + CELL_TO_INDEX[to]) // 2
+        jumping_colour = jumpedover_colour = None
+        for code, board in enumerate(state.boards):
+            if board >> fr_i & 1:
+                jumping_colour = REV_CODE_MAP[code]
+            if board >> mid & 1:
+                jumpedover_colour = REV_CODE_MAP[code]
+        return jumping_colour, jumpedover_colour
+
+    @staticmethod
+    def terminal_state(state):
+        if isinstance(state, Node):
+            state = state.state
+        return max(state.exited) == 4
+
+
+class UniformPolicy:
+    """
+    Playout policy that picks uniformly among all the moves
+    """
+
+    def __call__(self, exits, captures, forwards, others):
+        """
+        :param exits: exits of the player to move as (from, to, jumped over)
+            bits
+        :param captures: jumps over a piece of another colour
+        :param forwards: the other moves and jumps that go forward
+        :param others: the remaining moves and jumps
+        :return: the move to play, None to pass
+        """
+        moves = exits + captures + forwards + others
+        if not moves:
+            return None
+        return moves[randrange(len(moves))]
+
+
+class EpsilonGreedyPolicy(UniformPolicy):
+    """
+    Playout policy that picks a random exit if there is one, else a random
+    capture, else a random forward move, else any move. With probability
+    epsilon it picks uniformly among all the moves instead.
+    """
+
+    def __init__(self, epsilon=0.1):
+        """
+        :param epsilon: probability of a uniformly random move
+        """
+        self.epsilon = epsilon
+
+    def __call__(self, exits, captures, forwards, others):
+        if random() < self.epsilon:
+            return super().__call__(exits, captures, forwards, others)
+        for moves in (exits, captures, forwards, others):
+            if moves:
+                return moves[randrange(len(moves))]
+        return None
+
+
+UNIFORM_POLICY = UniformPolicy()
+
+
+def random_playout(state, max_depth=-1, repetitions=None, policy=None,
+                   played=None):
+    """
+    Play random actions from a state until the game ends, on three mutable
+    occupancy masks. Moves are kept as (from, to, jumped over) bits, so
+    nothing is allocated for the states in between and actions are never
+    cached.
+    :param state: State or BitboardState to start from, it is not modified
+    :param max_depth: maximum number of actions, -1 to play until the end
+    :param repetitions: stop when a position has been seen this many times
+        in the playout, None to never check
+    :param policy: picks the move of every ply from the moves split into
+        exits, captures, forward moves and the others, uniformly random
+        by default
+    :param played: list to which (colour code, from bit, to bit) of every
+        move is appended, see BIT_ACTIONS
+    :return: the BitboardState where the playout stopped, and whether it
+        stopped on a repeated position
+    """
+    if not isinstance(state, BitboardState):
+        state = BitboardState.from_state(state)
+    boards = list(state.boards)
+    exited = list(state.exited)
+    code = CODE_MAP[state.colour]
+    if policy is None:
+        policy = UNIFORM_POLICY
+    depth = 0
+    seen = defaultdict(int)
+    repeated = False
+    while max(exited) < 4 and depth != max_depth:
+        if repetitions is not None:
+            position = (boards[0], boards[1], boards[2], code)
+            seen[position] += 1
+            if seen[position] >= repetitions:
+                repeated = True
+                break
+        own = boards[code]
+        occupied = boards[0] | boards[1] | boards[2]
+        enemy = occupied & ~own
+        empty = BOARD & ~occupied
+        exits, captures, forwards, others = [], [], [], []
+        ready = own & EXIT_MASKS[code]
+        while ready:
+            low = ready & -ready
+            exits.append((low, 0, 0))
+            ready ^= low
+        for i, n in enumerate(COLOUR_SHIFTS[code]):
+            moves = forwards if i < FORWARD_DIRECTIONS else others
+            step = (own << n if n > 0 else own >> -n) & BOARD
+            steps = step & empty
+            while steps:
+                low = steps & -steps
+                moves.append((low >> n if n > 0 else low << -n, low, 0))
+                steps ^= low
+            jumps = step & occupied
+            jumps = (jumps << n if n > 0 else jumps >> -n) & empty
+            while jumps:
+                low = jumps & -jumps
+                mid = low >> n if n > 0 else low << -n
+                (captures if mid & enemy else moves).append(
+                    (mid >> n if n > 0 else mid << -n, low, mid))
+                jumps ^= low
+        move = policy(exits, captures, forwards, others)
+        # no move is a pass
+        if move is not None:
+            fr, to, mid = move
+            if played is not None:
+                played.append((code, fr, to))
+            if mid:
+                boards[0] &= ~mid
+                boards[1] &= ~mid
+                boards[2] &= ~mid
+            elif not to:
+                exited[code] += 1
+            boards[code] ^= fr | to
+            boards[code] |= mid
+        code = (code + 1) % 3
+        depth += 1
+    return BitboardState(tuple(boards), REV_CODE_MAP[code],
+                         tuple(exited)), repeated
+
+
+class BitboardNodeGame(NodeGame, BitboardGame):
+    """
+    NodeGame (search tree with memory) over bitboard states
+    """
+    pass
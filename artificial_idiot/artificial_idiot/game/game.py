@@ -1,11 +1,16 @@
 from artificial_idiot.util.misc import is_in
-from artificial_idiot.game.state import State
+from artificial_idiot.game.state import (
+    State, PIECE_KEYS, TURN_KEYS, COMPLETED_KEYS
+)
 from artificial_idiot.game.node import Node
 from artificial_idiot.util.queue import PriorityQueueImproved
 import abc
 from functools import lru_cache
 from collections import defaultdict
 
+# the action of a player who has no legal move
+PASS_ACTION = (None, None, "PASS")
+
 
 class Problem(abc.ABC):
     """
@@ -145,7 +150,7 @@ class Game(BoardProblem):
                     else:
                         actions.append(((q, r), move_to, "MOVE"))
 
-        return actions if len(actions) > 0 else [(None, None, "PASS")]
+        return actions if len(actions) > 0 else [PASS_ACTION]
 
     def result(self, state, action):
         """
@@ -156,30 +161,131 @@ class Game(BoardProblem):
         # TODO next color is a rule that should belong in the Game class
         next_colour = state.next_colour(state.colour)
         completed = state.completed.copy()
+        # Update the Zobrist key of the parent instead of rehashing the board
+        key = state.key ^ TURN_KEYS[state.colour] ^ TURN_KEYS[next_colour]
 
         fr, to, mv = action
         pos_to_piece = state.pos_to_piece
 
         if mv == "PASS":
             return state.__class__(pos_to_piece,
-                                   next_colour, state.completed)
+                                   next_colour, state.completed, key)
         # update dictionary
         colour = pos_to_piece.pop(fr)
+        key ^= PIECE_KEYS[fr, colour]
         if to is not None:
             pos_to_piece[to] = colour
+            key ^= PIECE_KEYS[to, colour]
         # one piece moved out
         else:
             if colour in completed:
-                completed[colour] = completed[colour] + 1
+                n_completed = completed[colour]
+                if n_completed:
+                    key ^= COMPLETED_KEYS[colour, n_completed]
+                completed[colour] = n_completed + 1
             else:
                 completed[colour] = 1
+            key ^= COMPLETED_KEYS[colour, completed[colour]]
 
         if mv == "JUMP":
-            leap_frog = (fr[0] + to[0])/2, (fr[1] + to[1])/2
+            leap_frog = (fr[0] + to[0]) // 2, (fr[1] + to[1]) // 2
+            key ^= (PIECE_KEYS[leap_frog, pos_to_piece[leap_frog]] ^
+                    PIECE_KEYS[leap_frog, colour])
             pos_to_piece[leap_frog] = colour
 
         # Construct the new state
-        return state.__class__(pos_to_piece, next_colour, completed)
+        return state.__class__(pos_to_piece, next_colour, completed, key)
+
+    def successors(self, state):
+        """
+        Return the (action, resulting state) pairs of all the actions that can
+        be executed in the given state, in the same order as actions
+        """
+        return [(action, self.result(state, action))
+                for action in self.actions(state)]
+
+    def apply(self, state, action):
+        """
+        Execute an action on a SearchState in place, the same transition as
+        result but without creating a new state.
+        :param state: SearchState, modified in place
+        :param action: an action of self.actions(state)
+        :return: the undo token to give to undo to restore the state
+        """
+        colour = state._colour
+        next_colour = state.next_colour(colour)
+        key = state.key
+        pos_to_piece = state._pos_to_piece
+        piece_to_pos = state._piece_to_pos
+        fr, to, mv = action
+        state._colour = next_colour
+        new_key = key ^ TURN_KEYS[colour] ^ TURN_KEYS[next_colour]
+        index = captured = captured_index = None
+
+        if mv != "PASS":
+            piece = pos_to_piece.pop(fr)
+            pieces = piece_to_pos[piece]
+            index = pieces.index(fr)
+            # The moved piece goes to the end of its list, the same order as
+            # the piece_to_pos of a state built by result
+            del pieces[index]
+            new_key ^= PIECE_KEYS[fr, piece]
+            if to is None:
+                # one piece moved out
+                n_completed = state.completed[piece]
+                if n_completed:
+                    new_key ^= COMPLETED_KEYS[piece, n_completed]
+                new_key ^= COMPLETED_KEYS[piece, n_completed + 1]
+                state.completed[piece] = n_completed + 1
+            else:
+                pieces.append(to)
+                pos_to_piece[to] = piece
+                new_key ^= PIECE_KEYS[to, piece]
+
+            if mv == "JUMP":
+                leap_frog = (fr[0] + to[0]) // 2, (fr[1] + to[1]) // 2
+                captured = pos_to_piece[leap_frog]
+                if captured != piece:
+                    captured_pieces = piece_to_pos[captured]
+                    captured_index = captured_pieces.index(leap_frog)
+                    del captured_pieces[captured_index]
+                    pieces.append(leap_frog)
+                    pos_to_piece[leap_frog] = piece
+                    new_key ^= (PIECE_KEYS[leap_frog, captured] ^
+                                PIECE_KEYS[leap_frog, piece])
+
+        state._key = new_key
+        return action, colour, key, index, captured, captured_index
+
+    def undo(self, state, token):
+        """
+        Restore a SearchState to exactly what it was before apply
+        :param state: SearchState that the action was applied to
+        :param token: the token returned by apply
+        """
+        action, colour, key, index, captured, captured_index = token
+        fr, to, mv = action
+        state._colour = colour
+        state._key = key
+        if mv == "PASS":
+            return
+        pos_to_piece = state._pos_to_piece
+        piece_to_pos = state._piece_to_pos
+        piece = colour if to is None else pos_to_piece[to]
+        pieces = piece_to_pos[piece]
+
+        if captured_index is not None:
+            leap_frog = pieces.pop()
+            piece_to_pos[captured].insert(captured_index, leap_frog)
+            pos_to_piece[leap_frog] = captured
+
+        if to is None:
+            state.completed[piece] -= 1
+        else:
+            pieces.pop()
+            del pos_to_piece[to]
+        pieces.insert(index, fr)
+        pos_to_piece[fr] = piece
 
     def update(self, colour, action):
         """
@@ -199,6 +305,19 @@ class Game(BoardProblem):
         jumpedover_colour = pos_to_piece[((fr[0]+to[0])//2, (fr[1]+to[1])//2)]
         return jumping_colour, jumpedover_colour
 
+    @classmethod
+    def noisy(cls, state, action):
+        """
+        Whether an action exits or captures a piece of another player
+        """
+        if action[2] == "EXIT":
+            return True
+        if action[2] != "JUMP":
+            return False
+        jumping_colour, jumpedover_colour = \
+            cls.jump_action_classification(state, action)
+        return jumping_colour != jumpedover_colour
+
     @staticmethod
     def terminal_state(state):
         if isinstance(state, Node):
@@ -296,14 +415,20 @@ class NodeGame(Game):
     #     return super().actions(state)
 
     def update(self, colour, action):
-        for child in self.initial_state.expand(self):
-            if child.action == action:
-                self.initial_state = child
-                return
-        else:
+        """
+        Move the root down to the child of the action. The rest of the tree
+        is from previous turns and is released
+        """
+        root = self.initial_state
+        if action not in self.actions(root.state):
             raise ValueError(f"No corresponding action {action} found."
                              f"Possible actions are "
-                             f"{[child.action for child in self.initial_state.children]}")
+                             f"{self.actions(root.state)}")
+        child = root.child_node(self, action)
+        del root.children[action]
+        root.release()
+        child.parent = None
+        self.initial_state = child
 
 
 class RewardedGame(Game):
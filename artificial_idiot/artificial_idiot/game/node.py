@@ -57,6 +57,18 @@ class Node:
             next_node = self.children[action]
         return next_node
 
+    def release(self):
+        """
+        Unlink the whole subtree of this node, so that it is freed as soon as
+        it is no longer referenced instead of by the cycle collector
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            stack.extend(node.children.values())
+            node.children = {}
+            node.parent = None
+
     @property
     def solution(self):
         """Return the sequence of actions to go from the root to this node."""
@@ -86,6 +98,10 @@ class BasicUCTNode(Node):
     Basically this node can be used for tabular Monte Carlo Tree search.
     """
     c = 2
+    # Whether update needs the (colour, action) of the playout
+    amaf = False
+    # Whether update needs the result of every colour instead of red's
+    vector = False
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -93,8 +109,9 @@ class BasicUCTNode(Node):
         #      in future version
         self.wins = 0
         self.visits = 0
-        # What child aren't explored yet
-        self.unexpanded_children = None
+        # Shuffled actions whose child isn't created yet, None until the
+        # first visit
+        self.untried_actions = None
         self.sorted_children = []
 
     @classmethod
@@ -105,9 +122,10 @@ class BasicUCTNode(Node):
         """
         Update the state of current node
         # TODO override this for a better model
-        :param result: The outcome of the game. 0 for lose 1 for win
+        :param result: The outcome of the game. 0 for lose 1 for win, a
+            playout cut short has a value in between
         """
-        self.wins += (result == 1)
+        self.wins += max(result, 0)
         self.visits += 1
 
     def tree_policy(self, game):
@@ -118,14 +136,12 @@ class BasicUCTNode(Node):
         :return: A move given by the above selection rule
         """
         # TODO update policy to be more abstracted
-        # Initialise the nodes
-        if self.unexpanded_children is None:
-            self.unexpanded_children = list(self.expand(game))
-            shuffle(self.unexpanded_children)
-        remaining = len(self.unexpanded_children)
-        if remaining > 0:
-            child = self.unexpanded_children.pop()
-            return child
+        # A child is only created when its action is tried
+        if self.untried_actions is None:
+            self.untried_actions = list(game.actions(self.state))
+            shuffle(self.untried_actions)
+        if self.untried_actions:
+            return self.child_node(game, self.untried_actions.pop())
         else:
             # Somehow this beats max([(f(v),v) for v in children])
             children = list(self.children.values())
@@ -143,13 +159,159 @@ class BasicUCTNode(Node):
     def show_path(self):
         path = self.path
         for node in path:
-            print(f"{hash(node)%9999}: [{node.wins:4d}, {node.visits:4d}]",
+            print(f"{hash(node)%9999}: [{node.wins:6.1f}, {node.visits:4d}]",
                   end=" --> ")
         print("<?>")
 
     def child_value(self, child):
-        return (child.wins / child.visits
-                + sqrt(self.c * log(self.visits) / child.visits))
+        return self.ucb(child.wins, child.visits, self.visits)
+
+    @classmethod
+    def ucb(cls, wins, visits, parent_visits):
+        """
+        Upper confidence bound of a child from its statistics
+        """
+        return wins / visits + sqrt(cls.c * log(parent_visits) / visits)
+
+
+class RAVEUCTNode(BasicUCTNode):
+    """
+    UCT node with all-moves-as-first statistics. The AMAF statistics of an
+    action count the playouts in which the player of this node played it
+    anywhere after this node. The value of a child is mixed with them by
+    beta = sqrt(k / (3 * visits + k)), so AMAF leads while the node has few
+    visits, and the untried action with the best AMAF value is tried first.
+    """
+    amaf = True
+    k = 1000
+    # AMAF value of an action never played in a playout
+    prior = 0.5
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # action -> [AMAF wins, AMAF visits], None until the first visit
+        self.amaf_stats = None
+
+    @classmethod
+    def set_k(cls, k):
+        cls.k = k
+
+    def update(self, result, played=None, *args, **kwargs):
+        """
+        :param played: set of (colour, action) played after this node, in
+            the tree and in the playout. The action of this node is added to
+            it for its parent
+        """
+        super().update(result)
+        if played is None:
+            return
+        if self.amaf_stats is not None:
+            win = max(result, 0)
+            colour = self.state.colour
+            for player, action in played:
+                stats = self.amaf_stats.get(action)
+                if player == colour and stats is not None:
+                    stats[0] += win
+                    stats[1] += 1
+        if self.parent is not None:
+            played.add((self.parent.state.colour, self.action))
+
+    def amaf_value(self, action):
+        wins, visits = self.amaf_stats[action]
+        return wins / visits if visits else self.prior
+
+    def tree_policy(self, game):
+        if self.untried_actions is None:
+            self.untried_actions = list(game.actions(self.state))
+            shuffle(self.untried_actions)
+            self.amaf_stats = {action: [0, 0]
+                               for action in self.untried_actions}
+        untried = self.untried_actions
+        if untried:
+            values = [self.amaf_value(action) for action in untried]
+            best = values.index(max(values))
+            untried[best], untried[-1] = untried[-1], untried[best]
+        return super().tree_policy(game)
+
+    def child_value(self, child):
+        beta = sqrt(self.k / (3 * self.visits + self.k))
+        value = (1 - beta) * child.wins / child.visits + \
+            beta * self.amaf_value(child.action)
+        return value + sqrt(self.c * log(self.visits) / child.visits)
+
+
+class VectorUCTNode(BasicUCTNode):
+    """
+    Three player UCT node. It sums the result of the playouts for every
+    colour, and the children of a node are selected by the result of the
+    colour to move at that node, so every player picks its own best moves
+    instead of the ones that are best for red.
+    """
+    vector = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # summed results indexed by colour code
+        self.rewards = [0, 0, 0]
+
+    def update(self, result, *args, **kwargs):
+        """
+        :param result: results of the playout indexed by colour code, a
+            loss counts as 0
+        """
+        for code, value in enumerate(result):
+            self.rewards[code] += max(value, 0)
+        # red's results, the ones of BasicUCTNode
+        self.wins = self.rewards[0]
+        self.visits += 1
+
+    def child_value(self, child):
+        code = self.state.code_map[self.state.colour]
+        return self.ucb(child.rewards[code], child.visits, self.visits)
+
+
+class DAGUCTNode:
+    """
+    A position of a UCT search over a DAG. Every path that reaches the
+    position shares its statistics, while the visits of each edge are kept
+    by the node the edge leaves from.
+    """
+    c = 2
+
+    def __init__(self, state):
+        self.state = state
+        self.wins = 0
+        self.visits = 0
+        # Shuffled actions without an edge yet, None until the first visit
+        self.untried_actions = None
+        # action -> [child node, visits of the edge]
+        self.edges = {}
+
+    @classmethod
+    def set_c(cls, c):
+        cls.c = c
+
+    def update(self, result):
+        self.wins += max(result, 0)
+        self.visits += 1
+
+    def edge_value(self, edge, parent_visits):
+        """
+        UCB of an edge for DAGs: the value of the child, which is merged over
+        all paths to it, explored by the visits of the edge
+        :param parent_visits: visits of all edges of this node
+        """
+        child, visits = edge
+        return child.wins / child.visits + \
+            sqrt(self.c * log(parent_visits) / visits)
+
+    def best_edge(self):
+        """
+        :return: the action and edge with the best UCB
+        """
+        parent_visits = sum(visits for _, visits in self.edges.values())
+        return max(self.edges.items(),
+                   key=lambda item: self.edge_value(item[1], parent_visits))
 
 
 class RLNode(Node):
@@ -1,4 +1,5 @@
 from copy import copy
+from random import Random
 from artificial_idiot.util.misc import print_board
 
 # I have to factor this out from python for some strange static variable
@@ -9,6 +10,29 @@ REV_CODE_MAP = {
 }
 
 
+class ZobristKeys(dict):
+    """
+    Random 64 bit keys for Zobrist hashing. A key is drawn the first time it
+    is requested, so any piece type (e.g. blocks in AStarState) and any
+    number of completed pieces can be hashed without declaring them first.
+    """
+    def __init__(self, seed):
+        super().__init__()
+        self._random = Random(seed)
+
+    def __missing__(self, key):
+        value = self[key] = self._random.getrandbits(64)
+        return value
+
+
+# (pos, piece) -> key
+PIECE_KEYS = ZobristKeys(30024)
+# colour to move -> key
+TURN_KEYS = ZobristKeys(30025)
+# (colour, number of completed pieces) -> key, no pieces completed hashes to 0
+COMPLETED_KEYS = ZobristKeys(30026)
+
+
 class State:
     """
     State class stores current node state, the state is represented
@@ -54,12 +78,14 @@ class State:
     #         return super(State, cls).__new__(cls)
 
     # TODO make checking fo completed faster/ and more robust
-    def __init__(self, pos_to_piece, colour, completed=None):
+    def __init__(self, pos_to_piece, colour, completed=None, key=None):
         """
         Captures all the information about the state
         :param colour: string that represent the current player
         :param pos_to_piece: a dictionary {pos : piece type}
         :param completed: a dictionary {piece type : number of exited}
+        :param key: the Zobrist key of the state if already known (computed
+            incrementally by Game.result), computed on demand otherwise
         """
         # This is the current active colour
         self._colour = colour
@@ -71,8 +97,7 @@ class State:
         if completed is None:
             completed = {col: 0 for col in self.code_map}
         self.completed = completed
-        self.frozen = None
-        self._hash = None
+        self._key = key
 
     def occupied(self, pos):
         return pos in self._pos_to_piece
@@ -197,19 +222,30 @@ class State:
                print_board(pos_to_piece, **kwargs, printed=False) + \
             "\n# Completed: " + str(self.completed)
 
+    @property
+    def key(self):
+        """
+        64 bit Zobrist key of the pieces on board, the colour to move and the
+        number of completed pieces of each colour
+        """
+        if self._key is None:
+            key = TURN_KEYS[self._colour]
+            for item in self._pos_to_piece.items():
+                key ^= PIECE_KEYS[item]
+            for item in self.completed.items():
+                if item[1]:
+                    key ^= COMPLETED_KEYS[item]
+            self._key = key
+        return self._key
+
     def __hash__(self):
-        if self.frozen is None:
-            self.frozen = frozenset(self._pos_to_piece.items())
-            self._hash = hash(self.frozen)
-        return self._hash
+        return self.key
 
     def __eq__(self, other):
-        # First compare hash, if hash is successful, compare id
-        # last compare the content for a fast comparison
-        # (This is based on experimental result of comparison speed)
-        return (hash(self) == hash(other) and
-                isinstance(other, State) and
-                self.frozen == other.frozen and
+        # Compare the keys first, then fall back to the content in case two
+        # different states collide on their key
+        return (isinstance(other, State) and
+                self.key == other.key and
                 self._colour == other._colour and
                 self._pos_to_piece == other._pos_to_piece and
                 self.completed == other.completed
@@ -229,6 +265,44 @@ class State:
         return -(r + q)
 
 
+class SearchState(State):
+    """
+    A mutable state that is changed in place by Game.apply and restored by
+    Game.undo, so a search can walk the whole tree with a single state.
+    The piece lists, completed counts and the Zobrist key are all kept up to
+    date by apply/undo.
+    """
+
+    def __init__(self, pos_to_piece, colour, completed=None, key=None):
+        self._colour = colour
+        self._pos_to_piece = dict(pos_to_piece)
+        self._piece_to_pos = {col: [] for col in self.code_map}
+        for location, piece in self._pos_to_piece.items():
+            self._piece_to_pos[piece].append(location)
+        self.completed = {col: 0 for col in self.code_map}
+        if completed is not None:
+            self.completed.update(completed)
+        self._key = key
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        A mutable copy of a state, the original state is not modified
+        """
+        return cls(state.pos_to_piece, state.colour, state.completed)
+
+    @property
+    def remaining_colours(self):
+        return {col for col, pieces in self._piece_to_pos.items() if pieces}
+
+    def snapshot(self):
+        """
+        An immutable State with the current content of this state
+        """
+        return State(self.pos_to_piece, self._colour, dict(self.completed),
+                     self.key)
+
+
 if __name__ == '__main__':
     def rotate_test():
         test = State({(1, -1): "red", (0, 0): "green", (0, 1): "blue"}, "blue", {"blue": 1})
@@ -0,0 +1,54 @@
+from unittest import TestCase
+import numpy as np
+from artificial_idiot.game.state import State
+from artificial_idiot.game.bitboard import BitboardGame, BitboardState
+from artificial_idiot.game.batch_rollout import BatchRollout
+from artificial_idiot.util.json_parser import JsonParser
+import json
+
+
+def parse_state(file_name):
+    f = open(file_name)
+    pos_dict, colour, completed = JsonParser(json.load(f)).parse()
+    return State(dict(pos_dict), colour, completed)
+
+
+class TestBatchRollout(TestCase):
+
+    def test_reset(self):
+        state = parse_state("../../tests/busy.json")
+        rollout = BatchRollout(4)
+        rollout.reset(state)
+        for bit_state in rollout.states():
+            self.assertEqual(BitboardState.from_state(state), bit_state)
+
+    def test_legal_steps(self):
+        # every step of every game goes to a successor of its last state
+        for file_name in ("red_initial_state", "busy", "eat_blue", "pass"):
+            state = parse_state(f"../../tests/{file_name}.json")
+            game = BitboardGame("red", state)
+            rollout = BatchRollout(16, rng=np.random.default_rng(0))
+            rollout.reset(state)
+            states = rollout.states()
+            games = np.arange(16)
+            for _ in range(30):
+                rollout.step(games)
+                rollout.colours[games] = (rollout.colours[games] + 1) % 3
+                children = rollout.states()
+                for parent, child in zip(states, children):
+                    self.assertIn(child, [successor for _, successor
+                                          in game.successors(parent)])
+                states = children
+                if any(max(child.exited) == 4 for child in children):
+                    break
+
+    def test_run(self):
+        state = parse_state("../../tests/must_exit_1.json")
+        states = BatchRollout(32).run(state)
+        self.assertEqual(32, len(states))
+        for end in states:
+            self.assertEqual(4, max(end.exited))
+        state = parse_state("../../tests/red_initial_state.json")
+        for end in BatchRollout(8, max_depth=2).run(state):
+            self.assertEqual("blue", end.colour)
+            self.assertEqual((0, 0, 0), end.exited)
@@ -0,0 +1,162 @@
+from unittest import TestCase
+from artificial_idiot.game.game import Game
+from artificial_idiot.game.state import State
+from artificial_idiot.game.bitboard import BitboardGame, BitboardState, \
+    random_playout, UniformPolicy, EpsilonGreedyPolicy, INDEX_TO_CELL, \
+    BIT_ACTIONS
+from artificial_idiot.util.json_parser import JsonParser
+import glob
+import json
+
+
+def parse_state(file_name):
+    f = open(file_name)
+    pos_dict, colour, completed = JsonParser(json.load(f)).parse()
+    return State(dict(pos_dict), colour, completed)
+
+
+def all_states():
+    return [parse_state(file_name) for file_name
+            in sorted(glob.glob("../../tests/*.json"))]
+
+
+class TestBitboardGame(TestCase):
+    depth = 2
+
+    def compare(self, game, state, bit_game, bit_state, depth):
+        self.assertEqual(set(game.actions(state)),
+                         set(bit_game.actions(bit_state)))
+        self.assertEqual(bit_game.successors(bit_state),
+                         [(action, bit_game.result(bit_state, action))
+                          for action in bit_game.actions(bit_state)])
+        self.assertEqual(game.terminal_state(state),
+                         bit_game.terminal_state(bit_state))
+        if depth == 0:
+            return
+        for action in game.actions(state):
+            child = game.result(state, action)
+            bit_child = bit_game.result(bit_state, action)
+            self.assertEqual(BitboardState.from_state(child), bit_child)
+            self.assertEqual(child.completed, bit_child.completed)
+            self.assertEqual(game.jump_action_classification(state, action),
+                             bit_game.jump_action_classification(bit_state,
+                                                                 action))
+            self.compare(game, child, bit_game, bit_child, depth - 1)
+
+    def test_same_as_game(self):
+        for state in all_states():
+            game = Game("red", state)
+            bit_game = BitboardGame("red", state)
+            self.compare(game, state, bit_game, bit_game.initial_state,
+                         self.depth)
+
+    def test_round_trip(self):
+        for state in all_states():
+            bit_state = BitboardState.from_state(state)
+            self.assertEqual(state, bit_state.to_state())
+            self.assertEqual(state.piece_to_pos.keys(),
+                             bit_state.piece_to_pos.keys())
+            for colour, pieces in state.piece_to_pos.items():
+                self.assertCountEqual(pieces, bit_state.piece_to_pos[colour])
+
+    def test_pass(self):
+        state = parse_state("../../tests/pass.json")
+        game = BitboardGame("red", state)
+        state = game.initial_state
+        self.assertEqual([(None, None, "PASS")], game.actions(state))
+        child = game.result(state, (None, None, "PASS"))
+        self.assertEqual(state.boards, child.boards)
+        self.assertEqual(state.next_colour(state.colour), child.colour)
+
+
+class TestRandomPlayout(TestCase):
+
+    def test_one_action(self):
+        # every single random action is a successor of the same game
+        for state in all_states():
+            bit_game = BitboardGame("red", state)
+            children = [child for _, child
+                        in bit_game.successors(bit_game.initial_state)]
+            if not children:
+                continue
+            for _ in range(5):
+                self.assertIn(random_playout(state, 1)[0], children)
+
+    def test_play_to_the_end(self):
+        state = parse_state("../../tests/red_initial_state.json")
+        original = State(state.pos_to_piece, state.colour, state.completed)
+        for _ in range(5):
+            end, repeated = random_playout(state)
+            self.assertFalse(repeated)
+            self.assertEqual(4, max(end.exited))
+            # captured pieces change colour, none is removed
+            self.assertEqual(12, sum(bin(board).count("1")
+                                     for board in end.boards) +
+                             sum(end.exited))
+        self.assertEqual(original, state)
+
+    def test_played(self):
+        # the recorded moves replay the playout
+        state = parse_state("../../tests/red_initial_state.json")
+        played = []
+        end, _ = random_playout(state, 30, played=played)
+        game = BitboardGame("red", state)
+        replay = game.initial_state
+        for code, fr, to in played:
+            while replay.code_map[replay.colour] != code:
+                replay = game.result(replay, (None, None, "PASS"))
+            replay = game.result(replay, BIT_ACTIONS[fr, to])
+        self.assertEqual(30, len(played))
+        self.assertEqual(end.boards, replay.boards)
+        self.assertEqual(end.exited, replay.exited)
+
+    def test_repetition(self):
+        state = parse_state("../../tests/red_initial_state.json")
+        # the first position is already seen once
+        end, repeated = random_playout(state, repetitions=1)
+        self.assertTrue(repeated)
+        self.assertEqual(BitboardState.from_state(state), end)
+
+    def test_greedy_policy(self):
+        # red exits before anything else
+        state = parse_state("../../tests/red_should_eat_green.json")
+        end, _ = random_playout(state, 1, policy=EpsilonGreedyPolicy(0))
+        self.assertEqual((1, 0, 0), end.exited)
+        # then captures
+        state = parse_state("../../tests/eat_green.json")
+        end, _ = random_playout(state, 1, policy=EpsilonGreedyPolicy(0))
+        self.assertEqual(0, end.boards[1])
+        # red exits all its pieces before the others get anywhere
+        state = parse_state("../../tests/exit.json")
+        for _ in range(5):
+            end, _ = random_playout(state, policy=EpsilonGreedyPolicy(0))
+            self.assertEqual((4, 3, 3), end.exited)
+
+    def test_policy_moves(self):
+        colours = []
+
+        class CheckPolicy(UniformPolicy):
+            # distance of a bit to the exits of the colour to move
+            def distance(self, bit, colour):
+                q, r = INDEX_TO_CELL[bit.bit_length() - 1]
+                return 3 - (q, r, -q - r)[colour]
+
+            def __call__(self, exits, captures, forwards, others):
+                colour = colours[-1]
+                for fr, to, mid in captures:
+                    self.test.assertTrue(mid)
+                for fr, to, mid in forwards:
+                    self.test.assertLess(self.distance(to, colour),
+                                         self.distance(fr, colour))
+                for fr, to, mid in others:
+                    self.test.assertGreaterEqual(self.distance(to, colour),
+                                                 self.distance(fr, colour))
+                colours.append((colour + 1) % 3)
+                return super().__call__(exits, captures, forwards, others)
+
+        policy = CheckPolicy()
+        policy.test = self
+        state = parse_state("../../tests/red_initial_state.json")
+        for _ in range(5):
+            colours.append(0)
+            random_playout(state, 100, policy=policy)
@@ -0,0 +1,100 @@
+from unittest import TestCase
+from artificial_idiot.game.game import Game
+from artificial_idiot.game.state import State, SearchState
+from artificial_idiot.util.json_parser import JsonParser
+from random import Random
+import glob
+import json
+
+
+def parse_state(file_name):
+    f = open(file_name)
+    pos_dict, colour, completed = JsonParser(json.load(f)).parse()
+    return State(dict(pos_dict), colour, completed)
+
+
+def rehash(state):
+    """
+    A copy of the state without the key, so it is computed from scratch
+    """
+    return State(state.pos_to_piece, state.colour, dict(state.completed))
+
+
+class TestZobrist(TestCase):
+    def test_incremental_key(self):
+        random = Random(0)
+        for file_name in sorted(glob.glob("../../tests/*.json")):
+            state = parse_state(file_name)
+            game = Game("red", state)
+            for _ in range(60):
+                if game.terminal_state(state):
+                    break
+                actions = game.actions(state)
+                state = game.result(state,
+                                    actions[random.randrange(len(actions))])
+                self.assertEqual(state.key, rehash(state).key)
+                self.assertEqual(state, rehash(state))
+
+    def test_key_depends_on_colour_and_completed(self):
+        pos_to_piece = {(0, 0): "red", (1, -1): "green"}
+        state = State(pos_to_piece, "red", {"red": 0, "green": 0, "blue": 0})
+        other_colour = State(pos_to_piece, "green",
+                             {"red": 0, "green": 0, "blue": 0})
+        other_completed = State(pos_to_piece, "red",
+                                {"red": 1, "green": 0, "blue": 0})
+        self.assertNotEqual(state.key, other_colour.key)
+        self.assertNotEqual(state.key, other_completed.key)
+        self.assertNotEqual(state, other_colour)
+        self.assertNotEqual(state, other_completed)
+
+    def test_transposition(self):
+        state = parse_state("../../tests/red_initial_state.json")
+        game = Game("red", state)
+        move_1 = ((-3, 0), (-2, 0), "MOVE")
+        move_2 = ((-3, 1), (-2, 1), "MOVE")
+        state_1 = game.result(state, move_1)
+        state_2 = game.result(state, move_2)
+        # skip the other players so that both orders reach the same board
+        for _ in range(2):
+            state_1 = game.result(state_1, (None, None, "PASS"))
+            state_2 = game.result(state_2, (None, None, "PASS"))
+        state_1 = game.result(state_1, move_2)
+        state_2 = game.result(state_2, move_1)
+        self.assertEqual(hash(state_1), hash(state_2))
+        self.assertEqual(state_1, state_2)
+
+    def test_collision_fallback(self):
+        state = State({(0, 0): "red"}, "red")
+        collided = State({(0, 1): "red"}, "red", key=state.key)
+        self.assertEqual(hash(state), hash(collided))
+        self.assertNotEqual(state, collided)
+
+
+class TestMakeUnmake(TestCase):
+    def test_apply_undo(self):
+        random = Random(1)
+        for file_name in sorted(glob.glob("../../tests/*.json")):
+            state = parse_state(file_name)
+            game = Game("red", state)
+            search_state = SearchState.from_state(state)
+            original_pieces = {colour: list(pieces) for colour, pieces
+                               in search_state.piece_to_pos.items()}
+            original = rehash(search_state)
+            tokens = []
+            for _ in range(40):
+                if game.terminal_state(state):
+                    break
+                actions = game.actions(state)
+                action = actions[random.randrange(len(actions))]
+                state = game.result(state, action)
+                tokens.append(game.apply(search_state, action))
+                self.assertEqual(state, search_state)
+                self.assertEqual(state.key, search_state.key)
+                for colour, pieces in state.piece_to_pos.items():
+                    self.assertCountEqual(pieces,
+                                          search_state.piece_to_pos[colour])
+            for token in reversed(tokens):
+                game.undo(search_state, token)
+            self.assertEqual(original, search_state)
+            self.assertEqual(original.key, search_state.key)
+            self.assertEqual(original_pieces, search_state.piece_to_pos)
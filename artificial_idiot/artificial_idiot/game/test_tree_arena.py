@@ -0,0 +1,44 @@
+from unittest import TestCase
+from artificial_idiot.game.tree_arena import TreeArena, ROOT, UNEXPANDED
+
+
+class TestTreeArena(TestCase):
+
+    def test_expand_and_grow(self):
+        tree = TreeArena(capacity=4)
+        tree.expand(ROOT, 3)
+        self.assertEqual(range(1, 4), tree.children(ROOT))
+        tree.update(2, 1)
+        # the arena doubles when the children do not fit
+        tree.expand(2, 5)
+        self.assertEqual(16, tree.capacity)
+        self.assertEqual(9, tree.size)
+        self.assertEqual(range(4, 9), tree.children(2))
+        self.assertEqual([1, 1], list(tree.visits[[ROOT, 2]]))
+        self.assertEqual(2, tree.parent[6])
+        self.assertEqual(UNEXPANDED, tree.n_children[6])
+        tree.clear()
+        self.assertEqual(1, tree.size)
+        self.assertEqual(UNEXPANDED, tree.n_children[ROOT])
+
+    def test_update(self):
+        tree = TreeArena()
+        tree.expand(ROOT, 2)
+        tree.expand(1, 2)
+        tree.update(4, 1)
+        tree.update(3, 0)
+        tree.update(2, 0.5)
+        self.assertEqual([3, 2, 1, 1, 1], list(tree.visits[:5]))
+        self.assertEqual([1.5, 1, 0.5, 0, 1], list(tree.wins[:5]))
+
+    def test_select(self):
+        tree = TreeArena()
+        tree.expand(ROOT, 3)
+        # unvisited children first
+        tree.update(1, 1)
+        tree.update(3, 0)
+        self.assertEqual(1, tree.select(ROOT, 2))
+        tree.update(2, 0)
+        tree.update(1, 1)
+        # same UCB as a BasicUCTNode, the winning child with 2 visits
+        self.assertEqual(0, tree.select(ROOT, 2))
@@ -0,0 +1,117 @@
+"""
+Search tree stored as a struct of arrays.
+
+A node is an index into preallocated NumPy arrays of its statistics, its
+parent and the range of its children, so a node takes 28 bytes instead of
+a Python object with a dictionary of children. The children of a node are
+allocated next to each other in the order of game.actions, so the action of
+a child is found from its position in the range and states are not stored.
+The arrays double in size when they are full.
+"""
+
+from math import log
+from random import randrange
+import numpy as np
+
+ROOT = 0
+# a node whose children are not allocated yet
+UNEXPANDED = -1
+
+FIELDS = (("visits", np.float64), ("wins", np.float64),
+          ("parent", np.int32), ("first_child", np.int32),
+          ("n_children", np.int32))
+
+
+class TreeArena:
+    """
+    UCT tree whose node statistics are NumPy arrays indexed by node
+    """
+
+    def __init__(self, capacity=1024):
+        """
+        :param capacity: number of nodes allocated at first
+        """
+        self.capacity = capacity
+        for name, dtype in FIELDS:
+            setattr(self, name, np.empty(capacity, dtype))
+        self.size = 0
+        self.clear()
+
+    def clear(self):
+        """
+        Remove every node but a new root
+        """
+        self.size = 1
+        self.visits[ROOT] = 0
+        self.wins[ROOT] = 0
+        self.parent[ROOT] = -1
+        self.n_children[ROOT] = UNEXPANDED
+
+    def grow(self, capacity):
+        """
+        Double the arrays until they hold capacity nodes
+        """
+        while self.capacity < capacity:
+            self.capacity *= 2
+        for name, _ in FIELDS:
+            array = getattr(self, name)
+            grown = np.empty(self.capacity, array.dtype)
+            grown[:self.size] = array[:self.size]
+            setattr(self, name, grown)
+
+    def expand(self, node, n_children):
+        """
+        Allocate the children of a node
+        """
+        first = self.size
+        last = first + n_children
+        if last > self.capacity:
+            self.grow(last)
+        self.visits[first:last] = 0
+        self.wins[first:last] = 0
+        self.parent[first:last] = node
+        self.n_children[first:last] = UNEXPANDED
+        self.first_child[node] = first
+        self.n_children[node] = n_children
+        self.size = last
+
+    def children(self, node):
+        """
+        :return: range of the children of a node
+        """
+        first = self.first_child[node]
+        return range(first, first + self.n_children[node])
+
+    def select(self, node, c):
+        """
+        :param c: exploration constant of UCB
+        :return: index among the children of an unvisited child, else of the
+            child with the best UCB
+        """
+        first = self.first_child[node]
+        last = first + self.n_children[node]
+        visits = self.visits[first:last]
+        unvisited = np.flatnonzero(visits == 0)
+        if len(unvisited):
+            return int(unvisited[randrange(len(unvisited))])
+        values = self.wins[first:last] / visits + \
+            np.sqrt(c * log(self.visits[node]) / visits)
+        return int(np.argmax(values))
+
+    def update(self, node, result):
+        """
+        Add a playout to a node and all its ancestors
+        :param result: 1 for a win, 0 for a loss, in between for a playout
+            cut short
+        """
+        win = max(result, 0)
+        while node >= 0:
+            self.visits[node] += 1
+            self.wins[node] += win
+            node = self.parent[node]
+
+    def nbytes(self):
+        """
+        Bytes of the allocated arrays
+        """
+        return sum(getattr(self, name).nbytes for name, _ in FIELDS)
@@ -1,8 +1,14 @@
 from artificial_idiot.search.randomsearch import RandomSearch
 from artificial_idiot.search.uct import UCTSearch
+from artificial_idiot.search.root_parallel import RootParallelUCTSearch
+from artificial_idiot.search.tree_parallel import TreeParallelUCTSearch
+from artificial_idiot.search.arena_uct import ArenaUCTSearch
+from artificial_idiot.search.dag_uct import DAGUCTSearch
 from artificial_idiot.search.max_n import MaxN
 # from artificial_idiot.search.RL import ParametrisedRL
 from artificial_idiot.search.mini_max import AlphaBetaSearch
+from artificial_idiot.search.best_reply import BestReplySearch
+from artificial_idiot.search.negamax import NegamaxSearch
 from artificial_idiot.search.open_game_book import OpenGameBook
 from artificial_idiot.search.composition_strategy import CompositionSearch
 from artificial_idiot.search.multi_player_search import MultiPlayerSearch
@@ -257,6 +263,20 @@ class ParanoidPlayer_Naive(ParanoidAgent):
         super().__init__(color, evaluator_generator, cutoff)
 
 
+class BestReplyPlayer(Player):
+    """
+    Player that searches with Best-Reply Search, with the same evaluator as
+    ParanoidPlayer_Naive
+    """
+    def __init__(self, color):
+        # utility_pieces, num_exited_piece, total_number_pieces, utility_distance
+        weights = [10, 100, 1]
+        evaluator_generator = NaiveEvaluatorGenerator(weights)
+        cutoff = DepthLimitCutoff(4)
+        search_algorithm = BestReplySearch(evaluator_generator, cutoff)
+        super().__init__(color, search_algorithm=search_algorithm)
+
+
 class GreedyPlayer(ParanoidAgent):
     """
     A greedy player is Parnoid Agent with with 0 layer look a head
@@ -276,14 +296,65 @@ class BasicUCTPlayer(Player):
     """
     def __init__(self, colour, evaluator=winloss_evaluator,
                  game_type=NodeGame, node_type=BasicUCTNode,
-                 initial_state=None, *args, **kwargs):
-        search = UCTSearch(*args, **kwargs)
+                 initial_state=None, node_budget=20000, *args, **kwargs):
+        """
+        The tree is kept between turns, node_budget bounds its size (a node
+        takes about 2KB)
+        """
+        search = UCTSearch(*args, evaluator=evaluator, node_type=node_type,
+                           node_budget=node_budget, **kwargs)
         super().__init__(colour, search, game_type, evaluator, initial_state)
         state = self.game.initial_state
         self.game = game_type(colour="red",
                               state=node_type(state))
 
 
+class RootParallelUCTPlayer(Player):
+    """
+    UCT player searching with a tree per worker process. The workers are
+    kept for the whole game and follow the moves of every player.
+    """
+    def __init__(self, colour, evaluator=winloss_evaluator,
+                 initial_state=None, *args, **kwargs):
+        search = RootParallelUCTSearch(*args, evaluator=evaluator, **kwargs)
+        super().__init__(colour, search, Game, evaluator, initial_state)
+
+    def update(self, colour, action):
+        super().update(colour, action)
+        self.search_algorithm.update(colour,
+                                     self.convert_action(action, 'player'))
+
+
+class TreeParallelUCTPlayer(Player):
+    """
+    UCT player whose worker processes all search one tree in shared memory
+    """
+    def __init__(self, colour, evaluator=winloss_evaluator,
+                 initial_state=None, *args, **kwargs):
+        search = TreeParallelUCTSearch(*args, evaluator=evaluator, **kwargs)
+        super().__init__(colour, search, Game, evaluator, initial_state)
+
+
+class ArenaUCTPlayer(Player):
+    """
+    UCT player whose tree is stored in NumPy arrays
+    """
+    def __init__(self, colour, evaluator=winloss_evaluator,
+                 initial_state=None, *args, **kwargs):
+        search = ArenaUCTSearch(*args, evaluator=evaluator, **kwargs)
+        super().__init__(colour, search, Game, evaluator, initial_state)
+
+
+class DAGUCTPlayer(Player):
+    """
+    UCT player that merges the statistics of transposed positions
+    """
+    def __init__(self, colour, evaluator=winloss_evaluator,
+                 initial_state=None, *args, **kwargs):
+        search = DAGUCTSearch(*args, evaluator=evaluator, **kwargs)
+        super().__init__(colour, search, Game, evaluator, initial_state)
+
+
 class PlayerFactory:
     @staticmethod
     def get_type_factory(type):
@@ -4,7 +4,13 @@ from artificial_idiot.search import max_n
 from artificial_idiot.search import open_game_book
 from artificial_idiot.search import randomsearch
 from artificial_idiot.search import mini_max
+from artificial_idiot.search import best_reply
+from artificial_idiot.search import negamax
 from artificial_idiot.search import uct
+from artificial_idiot.search import root_parallel
+from artificial_idiot.search import tree_parallel
+from artificial_idiot.search import arena_uct
+from artificial_idiot.search import dag_uct
 
 
 from artificial_idiot.search.search_cutoff import cutoff
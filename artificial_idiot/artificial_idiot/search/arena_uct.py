@@ -0,0 +1,74 @@
+from time import process_time
+import numpy as np
+from artificial_idiot.search.uct import UCTSearch
+from artificial_idiot.game.bitboard import random_playout
+from artificial_idiot.game.tree_arena import TreeArena, ROOT, UNEXPANDED
+
+
+class ArenaUCTSearch(UCTSearch):
+    """
+    UCT on a TreeArena instead of a tree of nodes. The tree is built again
+    for every search and the state of a leaf is found by playing the actions
+    of its path from the root. Playouts are always played on a bitboard.
+    """
+
+    def __init__(self, capacity=1024, **kwargs):
+        """
+        :param capacity: number of nodes allocated at first, the arena grows
+            when it is full
+        :param kwargs: options of UCTSearch
+        """
+        super().__init__(**kwargs)
+        self.tree = TreeArena(capacity)
+
+    def select_expand(self, game, state):
+        """
+        Descend from the root by UCB, allocating the children of the nodes
+        on the way, down to the first unvisited node
+        :return: the node and its state
+        """
+        tree = self.tree
+        node = ROOT
+        while not game.terminal_state(state):
+            actions = game.actions(state)
+            if tree.n_children[node] == UNEXPANDED:
+                tree.expand(node, len(actions))
+            index = tree.select(node, self.c)
+            node = tree.first_child[node] + index
+            state = game.result(state, actions[index])
+            if tree.visits[node] == 0:
+                break
+        return node, state
+
+    def search(self, game, state, iteration=None, max_depth=None,
+               max_time=None, **kwargs):
+        """
+        :return: action of the most visited child of the root
+        """
+        if iteration is None:
+            iteration = self.iteration
+        if max_time is None:
+            max_time = self.max_time
+        if max_depth is None:
+            max_depth = self.rollout_depth
+        if iteration is None and max_time is None:
+            raise ValueError("UCT search needs an iteration or time budget")
+        tree = self.tree
+        tree.clear()
+        start = process_time()
+        self.playouts = 0
+        while (iteration is None or self.playouts < iteration) and \
+                (max_time is None or process_time() - start < max_time):
+            node, leaf = self.select_expand(game, state)
+            final_state, repeated = random_playout(
+                leaf, max_depth, self.repetitions, self.playout_policy)
+            tree.update(node, self.playout_value(game, final_state,
+                                                 repeated))
+            self.playouts += 1
+        self.nodes = tree.size
+        actions = game.actions(state)
+        if tree.n_children[ROOT] == UNEXPANDED:
+            tree.expand(ROOT, len(actions))
+        children = tree.children(ROOT)
+        visits = tree.visits[children.start:children.stop]
+        return actions[int(np.argmax(visits))]
@@ -0,0 +1,112 @@
+from math import inf
+from random import random
+from artificial_idiot.search.search import Search
+from artificial_idiot.game.game import PASS_ACTION
+
+
+# Best-Reply Search
+# from Schadd and Winands, Best Reply Search for Multiplayer Games, 2011
+class BestReplySearch(Search):
+    """
+    Red maximises while the moves of every opponent are merged into a single
+    min layer: only the one opponent reply that is the worst for red is
+    played, and the other opponents pass. Every two layers are a round of red
+    moves, so the search gets much deeper than the paranoid search for the
+    same number of nodes.
+    """
+
+    def __init__(self, utility_generator, terminal_test):
+        """
+        :param utility_generator: evaluator generator, valued for red
+        :param terminal_test: cutoff test (state, depth) -> bool, every max
+            and every min layer is one depth
+        """
+        self.utility_generator = utility_generator
+        self.terminal_test = terminal_test
+        self.nodes = 0
+        self.debug = False
+
+    def state_value(self, state):
+        return self.utility_generator(state)("red")
+
+    def red_children(self, game, state, depth):
+        """
+        (action, child) of red, sorted by static evaluation at the root and
+        with captures and exits first below it
+        """
+        children = [(action, game.result(state, action))
+                    for action in game.actions(state)]
+        if depth == 0:
+            return [(action, child) for _, _, action, child in sorted(
+                ((self.state_value(child), random(), action, child)
+                 for action, child in children), reverse=True)]
+        return sorted(children, key=lambda x: game.noisy(state, x[0]),
+                      reverse=True)
+
+    def opponent_children(self, game, state):
+        """
+        (action, child) of every move of every opponent, where all the other
+        opponents pass so that red moves next in every child.
+        Captures and exits come first.
+        """
+        noisy = []
+        quiet = []
+        mover = state
+        while mover.colour != "red":
+            for action in game.actions(mover):
+                # Passing is the same as letting another opponent reply
+                if action[2] == "PASS":
+                    continue
+                child = game.result(mover, action)
+                while child.colour != "red":
+                    child = game.result(child, PASS_ACTION)
+                if game.noisy(mover, action):
+                    noisy.append((action, child))
+                else:
+                    quiet.append((action, child))
+            mover = game.result(mover, PASS_ACTION)
+        # none of the opponents can move
+        if not noisy and not quiet:
+            return [(PASS_ACTION, mover)]
+        return noisy + quiet
+
+    def max_value(self, game, state, depth, a, b):
+        self.nodes += 1
+        if self.terminal_test(state, depth) or game.terminal_state(state):
+            return self.state_value(state), None
+        value = -inf
+        best_action = None
+        for action, child in self.red_children(game, state, depth):
+            new_value, _ = self.min_value(game, child, depth + 1, a, b)
+            if self.debug:
+                print(f'{depth} {action} {float(new_value):.3}')
+            if new_value > value:
+                best_action = action
+                value = new_value
+            # opponent won't allow you to chose a better move
+            if value >= b:
+                break
+            a = max(a, value)
+        return value, best_action
+
+    def min_value(self, game, state, depth, a, b):
+        self.nodes += 1
+        if self.terminal_test(state, depth) or game.terminal_state(state):
+            return self.state_value(state), None
+        value = +inf
+        best_action = None
+        for action, child in self.opponent_children(game, state):
+            new_value, _ = self.max_value(game, child, depth + 1, a, b)
+            if new_value < value:
+                best_action = action
+                value = new_value
+            if value <= a:
+                break
+            b = min(b, value)
+        return value, best_action
+
+    def search(self, game, state, depth=0, **kwargs):
+        best_v, best_action = self.max_value(game, state, depth, -inf, inf)
+        if self.debug:
+            print('Best utility is', best_v)
+        return best_action
@@ -1,4 +1,5 @@
 from artificial_idiot.search.search import Search
+from artificial_idiot.search.negamax import NegamaxSearch
 from artificial_idiot.evaluation.evaluator_generator import *
 from time import process_time
 
@@ -8,16 +9,22 @@ class CompositionSearch(Search):
     Defines a composite search pattern where based on the number of players
     alive the behavior will swap to different search methods
         3 player -> beginning: book + search
-        2 player -> search
+        2 player -> search, two player search when given
         1 player -> part A heuristic
     """
     def __init__(self, book=None, aggressive=None, defensive=None,
-                 simple_aggressive=None, simple_defensive=None):
+                 simple_aggressive=None, simple_defensive=None,
+                 two_player=None):
+        """
+        :param two_player: search used while only two colours have pieces
+            left, e.g. NegamaxSearch
+        """
         self.book = book
         self.aggressive = aggressive
         self.defensive = defensive
         self.simple_aggressive = simple_aggressive
         self.simple_defensive = simple_defensive
+        self.two_player = two_player
         self.total_time = 0
 
     def search(self, game, state, **kwargs):
@@ -31,6 +38,12 @@ class CompositionSearch(Search):
             if action is not None:
                 return action
 
+        if self.two_player is not None and self.total_time < 50 and \
+                len(NegamaxSearch.remaining_players(state)) == 2:
+            action = self.two_player.search(game, state, **kwargs)
+            self.total_time += process_time() - start
+            return action
+
         if self.total_time < 50:
             aggressive = self.aggressive
             defensive = self.defensive
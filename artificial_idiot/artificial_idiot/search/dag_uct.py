@@ -0,0 +1,118 @@
+from random import shuffle
+from time import process_time
+from artificial_idiot.search.uct import UCTSearch
+from artificial_idiot.game.node import DAGUCTNode
+from artificial_idiot.game.bitboard import random_playout
+
+
+class DAGUCTSearch(UCTSearch):
+    """
+    UCT over a DAG of positions. The nodes are kept in a table keyed by
+    state, so a position reached by different orders of moves has a single
+    node whose statistics are merged over all of them. Playouts are always
+    played on a bitboard.
+    """
+
+    def __init__(self, node_type=DAGUCTNode, **kwargs):
+        """
+        :param node_type: node class of the DAG
+        :param kwargs: options of UCTSearch
+        """
+        super().__init__(node_type=node_type, **kwargs)
+        # state -> node of the last search
+        self.table = {}
+        # edges added in the last search, and those that led to a position
+        # already in the table
+        self.edges = 0
+        self.merges = 0
+
+    @property
+    def merge_rate(self):
+        """
+        Fraction of the new edges that reached a known position
+        """
+        return self.merges / self.edges if self.edges else 0
+
+    def add_edge(self, game, node, action):
+        """
+        Add the edge of an untried action, to the node of its position in the
+        table if there is one
+        :return: the child and whether it is new
+        """
+        state = game.result(node.state, action)
+        child = self.table.get(state)
+        self.edges += 1
+        new = child is None
+        if new:
+            child = self.node_type(state)
+            self.table[state] = child
+        else:
+            self.merges += 1
+        node.edges[action] = [child, 0]
+        return child, new
+
+    def select_expand(self, game, root):
+        """
+        Descend by the UCB of the edges down to a new node. A known position
+        reached by a new edge is descended through as well, and the descent
+        stops when it goes back to a position of the path.
+        :return: the nodes of the path, the edges taken and the node the
+            playout starts from
+        """
+        node = root
+        path = [root]
+        edges = []
+        while not game.terminal_state(node.state):
+            if node.untried_actions is None:
+                node.untried_actions = list(game.actions(node.state))
+                shuffle(node.untried_actions)
+            if node.untried_actions:
+                action = node.untried_actions.pop()
+                child, new = self.add_edge(game, node, action)
+            else:
+                action, (child, _) = node.best_edge()
+                new = False
+            edges.append(node.edges[action])
+            # A cycle, the child is already updated once for the path
+            if child in path:
+                return path, edges, child
+            path.append(child)
+            node = child
+            if new:
+                break
+        return path, edges, node
+
+    def search(self, game, state, iteration=None, max_depth=None,
+               max_time=None, **kwargs):
+        """
+        :return: action of the most visited edge of the root
+        """
+        if iteration is None:
+            iteration = self.iteration
+        if max_time is None:
+            max_time = self.max_time
+        if max_depth is None:
+            max_depth = self.rollout_depth
+        if iteration is None and max_time is None:
+            raise ValueError("UCT search needs an iteration or time budget")
+        root = self.node_type(state)
+        self.table = {state: root}
+        self.edges = 0
+        self.merges = 0
+        start = process_time()
+        self.playouts = 0
+        while (iteration is None or self.playouts < iteration) and \
+                (max_time is None or process_time() - start < max_time):
+            path, edges, leaf = self.select_expand(game, root)
+            final_state, repeated = random_playout(
+                leaf.state, max_depth, self.repetitions, self.playout_policy)
+            result = self.playout_value(game, final_state, repeated)
+            for node in path:
+                node.update(result)
+            for edge in edges:
+                edge[1] += 1
+            self.playouts += 1
+        self.nodes = len(self.table)
+        if not root.edges:
+            return game.actions(state)[0]
+        return max(root.edges.items(), key=lambda item: item[1][1])[0]
@@ -1,6 +1,7 @@
 from math import inf
 
 from artificial_idiot.search.search import Search
+from artificial_idiot.game.state import SearchState
 
 
 class MaxN(Search):
@@ -8,31 +9,64 @@ class MaxN(Search):
     Generic Max N algorithm
     """
 
-    def __init__(self, evaluate, cut_off_test, n_player):
+    def __init__(self, evaluate, cut_off_test, n_player, make_unmake=False,
+                 max_sum=None, speculative=False):
         """
         Initialize A Max N search algorithm
         :param evaluate: func, that returns the utility of a state
         :param cut_off_test: func, tests if to stop evaluating this state
         :param n_player: int, number of players
+        :param make_unmake: search on a single SearchState with Game.apply
+            and Game.undo instead of creating a new state for every node
+        :param max_sum: sum of the utilities of all players, which must all
+            be non negative, e.g. 1 with ConstantSumEvaluatorGenerator.
+            Turns on shallow pruning, None searches every node
+        :param speculative: also prune with the bound of the grandparent,
+            searching the pruned nodes again when it turns out to be wrong
         """
         self._eval = evaluate
         self._n = n_player
         self._cut_off_test = cut_off_test
+        self.make_unmake = make_unmake
+        self._max_sum = max_sum
+        self._speculative = speculative
+        self.nodes = 0
+        self.researches = 0
 
     def _evaluate(self, state):
+        if self.make_unmake:
+            # The evaluator is only queried after the search left the state,
+            # so it must not hold on to the state that is changed in place
+            state = state.snapshot()
         return self._eval(state)
 
-    def _recursive_max_search(self, game, state, depth):
+    def _recursive_max_search(self, game, state, depth, parent=None,
+                              grandparent=None):
+        """
+        :param parent: (player, utility) of the best child of the parent
+            node so far, None if it has none or there is no pruning
+        :param grandparent: the same for the grandparent node
+        :return: the utility, the best action and whether the search was
+            cut by speculative pruning
+        """
+        self.nodes += 1
         player = state.colour
         # cut off test
         if self._cut_off_test(state, depth=depth) or game.terminal_state(state):
-            return self._evaluate(state), None
+            return self._evaluate(state), None, False
         # initialize utility to be the worst possible
         v_max = None
         a_best = None
-        for a in game.actions(state):
-            result_state = game.result(state, a)
-            v, _ = self._recursive_max_search(game, result_state, depth=depth+1)
+        # (action, state, utility, cut by speculative pruning) of children
+        children = []
+        for a, result_state in self._children(game, state):
+            v, pruned = self._search_child(game, state, a, result_state,
+                                           depth, v_max, parent)
+            children.append((a, result_state, v, pruned))
+            # The utility of a pruned child is only a bound for its own
+            # player, so it is left out until it is searched again
+            if pruned:
+                continue
             # print(result_state)
             # print(f'{v(player):.2f} value for {player} for ^^^ state \nResult {v("red"):.2f} for red')
             if v_max is None:
@@ -42,14 +76,73 @@ class MaxN(Search):
             if v(player) > v_max(player):
                 v_max = v
                 a_best = a
-        return v_max, a_best
+            if parent is None:
+                continue
+            # the parent will not choose this node whatever the other
+            # children are
+            if v_max(player) + parent[1] >= self._max_sum:
+                return v_max, a_best, False
+            if grandparent is not None and v_max(player) + parent[1] + \
+                    grandparent[1] >= self._max_sum:
+                return v_max, a_best, True
+
+        # If this node would choose a pruned child, the parent will not
+        # choose this node. The pruned children only have to be searched
+        # again if the best of the others can be chosen by the parent
+        if parent is not None and v_max(parent[0]) > parent[1] and \
+                any(pruned for _, _, _, pruned in children):
+            v_max = None
+            a_best = None
+            for a, result_state, v, pruned in children:
+                if pruned:
+                    self.researches += 1
+                    v, _ = self._search_child(game, state, a, result_state,
+                                              depth, None, None)
+                if v_max is None or v(player) > v_max(player):
+                    v_max = v
+                    a_best = a
+        return v_max, a_best, False
+
+    def _search_child(self, game, state, a, result_state, depth, v_max,
+                      parent):
+        """
+        Search the child after an action
+        :param v_max: utility of the best child of state so far, None to
+            search the child without pruning
+        :param parent: bound of the parent of state, None to search the child
+            without speculative pruning
+        :return: the utility and whether it was cut by speculative pruning
+        """
+        bound = None
+        if self._max_sum is not None and v_max is not None:
+            bound = (state.colour, v_max(state.colour))
+        grandparent = parent if self._speculative else None
+        if self.make_unmake:
+            token = game.apply(state, a)
+        v, _, pruned = self._recursive_max_search(game, result_state,
+                                                  depth + 1, bound,
+                                                  grandparent)
+        if self.make_unmake:
+            game.undo(state, token)
+        return v, pruned
+
+    def _children(self, game, state):
+        """
+        (action, child) pairs, in make/unmake mode the child is the state
+        itself as it is changed in place by Game.apply
+        """
+        if self.make_unmake:
+            return ((a, state) for a in game.actions(state))
+        return game.successors(state)
 
     def search(self, game, state, depth=1, **kwargs):
         # no exploration needed if only there is no choice to be made
         actions = game.actions(state)
         if len(actions) == 1:
             return actions[0]
+        if self.make_unmake:
+            state = SearchState.from_state(state)
         # find best action
-        _, a = self._recursive_max_search(game, state, depth)
+        _, a, _ = self._recursive_max_search(game, state, depth)
         return a
 
@@ -1,21 +1,364 @@
 from math import inf
 from artificial_idiot.search.search import Search
+from artificial_idiot.game.state import SearchState
+from artificial_idiot.search.transposition import EXACT, LOWER, UPPER
 from random import random
+from time import process_time
+from copy import copy
+from collections import defaultdict
+
+
+# Width of the window used to test if a move is better than the best one
+NULL_WINDOW = 1e-6
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the time budget of a move is used up
+    """
+    pass
 
 
 # Alpha - Beta search
 # from AIMA p 170
 class AlphaBetaSearch(Search):
 
-    def __init__(self, utility_generator, terminal_test):
+    def __init__(self, utility_generator, terminal_test, make_unmake=False,
+                 transposition_table=None, time_budget=None,
+                 dynamic_ordering=False, principal_variation_search=False,
+                 aspiration_window=None, quiescence_depth=None,
+                 late_move_reduction=None, futility_margin=None):
+        """
+        :param utility_generator: evaluator generator, valued for red
+        :param terminal_test: cutoff test (state, depth) -> bool
+        :param make_unmake: search on a single SearchState with Game.apply
+            and Game.undo instead of creating a new state for every node
+        :param transposition_table: TranspositionTable shared by all the
+            searches, None to search without one
+        :param time_budget: CPU seconds per move. When given, the search
+            deepens iteratively up to the max depth of terminal_test and
+            returns the best action of the deepest completed iteration
+        :param dynamic_ordering: below the root, order actions by killer
+            moves and history instead of evaluating every child
+        :param principal_variation_search: search every move after the first
+            one of a node with a null window first, and only search it again
+            with the full window when it turns out to be better
+        :param aspiration_window: with iterative deepening, search each
+            iteration with this distance around the value of the previous
+            one, and again with the full window when the value falls outside
+        :param quiescence_depth: search every action of every player and
+            extend the horizon with up to this many plies of capturing jumps
+            and exits. None keeps the selective search, where red only
+            jumps or exits below the root and the opponents only capture red
+            or play their best reply by static evaluation
+        :param late_move_reduction: number of moves of a node searched to
+            the full depth, for the opponents a move is a pair of green and
+            blue actions. The quiet moves after them are searched one depth
+            shallower first, and again only if they turn out to be better
+        :param futility_margin: at the last depth before the horizon, quiet
+            moves are not searched when the static value of the node plus
+            this margin can not get past the window
+        """
         self.terminal_test = terminal_test
         self.utility_generator = utility_generator
+        self.make_unmake = make_unmake
+        self.transposition_table = transposition_table
+        self.time_budget = time_budget
+        self.dynamic_ordering = dynamic_ordering
+        self.principal_variation_search = principal_variation_search
+        self.aspiration_window = aspiration_window
+        self.quiescence_depth = quiescence_depth
+        self.late_move_reduction = late_move_reduction
+        self.futility_margin = futility_margin
+        # (depth, colour) -> the last two actions that caused a cutoff
+        self.killers = defaultdict(list)
+        # action -> how much it caused cutoffs
+        self.history = defaultdict(int)
+        # number of nodes searched and states evaluated
+        self.nodes = 0
+        self.evaluations = 0
+        # number of searches repeated because a window was too narrow
+        self.researches = 0
+        self.aspiration_failures = 0
+        # number of moves searched shallower and not searched at all
+        self.reductions = 0
+        self.futility_prunes = 0
+        # best action of the exact nodes of the previous iteration
+        self.principal_variation = {}
+        self.deadline = None
+        # the root has no capture, so the search does not get any deeper
+        self.selective_root = False
+        # max depth of the last completed iteration
+        self.depth_reached = None
         self.debug = False
 
     def state_value(self, state):
+        self.evaluations += 1
         utility_generator = self.utility_generator(state)
         return utility_generator("red")
 
+    def make(self, game, state, action, child=None):
+        """
+        Get to the state after an action
+        :param child: the resulting state if it is already known
+        :return: the child state, and the undo token for unmake
+        """
+        if child is not None:
+            return child, None
+        if self.make_unmake:
+            return state, game.apply(state, action)
+        return game.result(state, action), None
+
+    def unmake(self, game, state, token):
+        """
+        Come back from a state reached by make
+        """
+        if token is not None:
+            game.undo(state, token)
+
+    def sorted_children(self, game, state, reverse=False):
+        """
+        Sort the actions of a state by the value of the state they lead to.
+        :return: list of (value, tie breaker, action, child), the child is
+            None in make/unmake mode and is made again when searched
+        """
+        if not self.make_unmake:
+            return sorted(((self.state_value(child), random(), action, child)
+                           for action, child in game.successors(state)),
+                          reverse=reverse)
+        children = []
+        for action in game.actions(state):
+            token = game.apply(state, action)
+            children.append((self.state_value(state), random(), action, None))
+            game.undo(state, token)
+        return sorted(children, reverse=reverse)
+
+    def check_time(self):
+        if self.deadline is not None and process_time() > self.deadline:
+            raise SearchTimeout
+
+    def probe(self, key, depth, a, b):
+        """
+        Look up a state in the transposition table
+        :param key: hash of the state
+        :param depth: depth of the state in the search
+        :return: (value, a, b, best action). value is None unless the stored
+            result is enough to return right away, a and b are narrowed by
+            the stored bound
+        """
+        self.check_time()
+        if self.transposition_table is None:
+            return None, a, b, self.principal_variation.get(key)
+        entry = self.transposition_table.probe(key)
+        if entry is None:
+            return None, a, b, self.principal_variation.get(key)
+        _, draft, value, flag, best_action = entry
+        if draft >= self.terminal_test.max_depth - depth:
+            if flag == EXACT:
+                return value, a, b, best_action
+            if flag == LOWER:
+                a = max(a, value)
+            else:
+                b = min(b, value)
+            if a >= b:
+                return value, a, b, best_action
+        return None, a, b, best_action
+
+    def store(self, key, depth, value, a, b, best_action):
+        """
+        Save the value of a state searched with the window (a, b)
+        """
+        if value <= a:
+            flag = UPPER
+        elif value >= b:
+            flag = LOWER
+        else:
+            flag = EXACT
+        if self.time_budget is not None and flag == EXACT and \
+                best_action is not None:
+            self.principal_variation[key] = best_action
+        if self.transposition_table is None:
+            return
+        self.transposition_table.store(key, self.terminal_test.max_depth -
+                                       depth, value, flag, best_action)
+
+    @staticmethod
+    def move_first(items, action, get_action=lambda x: x):
+        """
+        Put the item of an action in front so that it is searched first
+        """
+        if action is None:
+            return items
+        for i, item in enumerate(items):
+            if get_action(item) == action:
+                return [item] + items[:i] + items[i + 1:]
+        return items
+
+    def ordered_actions(self, game, state, depth):
+        """
+        Actions sorted by killer moves first, then by history.
+        Nothing is evaluated, so this is much cheaper than sorted_children
+        """
+        actions = game.actions(state)
+        if not self.dynamic_ordering:
+            return actions
+        killers = self.killers[depth, state.colour]
+        history = self.history
+        return sorted(actions, key=lambda action: (action in killers,
+                                                   history[action]),
+                      reverse=True)
+
+    def record_cutoff(self, depth, colour, action):
+        """
+        Remember an action that caused a cutoff at a depth
+        """
+        if not self.dynamic_ordering:
+            return
+        killers = self.killers[depth, colour]
+        if action not in killers:
+            killers.insert(0, action)
+            del killers[2:]
+        draft = self.terminal_test.max_depth - depth
+        self.history[action] += draft * draft
+
+    def scout(self, value_function, game, state, depth, a, b, maximise):
+        """
+        Search a move that is not the first one of a node. With principal
+        variation search it is only tested against the best value so far,
+        and searched again if it can be better.
+        :param value_function: min_value or max_value of the child
+        :param maximise: whether the parent of the child maximises
+        """
+        if not self.principal_variation_search or b - a <= NULL_WINDOW:
+            return value_function(game, state, depth, a, b)
+        if maximise and a != -inf:
+            value, action = value_function(game, state, depth,
+                                           a, a + NULL_WINDOW)
+        elif not maximise and b != +inf:
+            value, action = value_function(game, state, depth,
+                                           b - NULL_WINDOW, b)
+        else:
+            return value_function(game, state, depth, a, b)
+        if a < value < b:
+            self.researches += 1
+            value, action = value_function(game, state, depth, a, b)
+        return value, action
+
+    def reply_children(self, game, state, depth, table_action=None):
+        """
+        Children of an opponent in the order they are searched, in the same
+        format as sorted_children. They are only evaluated when needed to
+        pick the best reply.
+        """
+        if self.quiescence_depth is None:
+            return self.sorted_children(game, state)
+        if self.dynamic_ordering:
+            actions = self.ordered_actions(game, state, depth)
+            return [(None, None, action, None) for action
+                    in self.move_first(actions, table_action)]
+        return self.move_first(self.sorted_children(game, state),
+                               table_action, lambda x: x[2])
+
+    def horizon_value(self, game, state, a, b):
+        """
+        Value of a state where the search stops
+        """
+        if self.quiescence_depth is None or game.terminal_state(state):
+            return self.state_value(state)
+        return self.quiescence(game, state, a, b, self.quiescence_depth)
+
+    def quiescence(self, game, state, a, b, depth):
+        """
+        Search only capturing jumps and exits until the state is quiet.
+        Every player can also stand pat and keep the static value.
+        :param depth: number of plies that can still be extended
+        :return: value of the state
+        """
+        self.nodes += 1
+        self.check_time()
+        value = self.state_value(state)
+        if depth == 0 or game.terminal_state(state):
+            return value
+        maximise = state.colour == "red"
+        if maximise:
+            if value >= b:
+                return value
+            a = max(a, value)
+        else:
+            if value <= a:
+                return value
+            b = min(b, value)
+        for action in game.actions(state):
+            if not game.noisy(state, action):
+                continue
+            child, token = self.make(game, state, action)
+            new_value = self.quiescence(game, child, a, b, depth - 1)
+            self.unmake(game, child, token)
+            if maximise:
+                value = max(value, new_value)
+                if value >= b:
+                    break
+                a = max(a, value)
+            else:
+                value = min(value, new_value)
+                if value <= a:
+                    break
+                b = min(b, value)
+        return value
+
+    def search_child(self, value_function, game, state, depth, a, b,
+                     maximise, first, reduce=False):
+        """
+        Search a child with the options of the search
+        :param first: whether it is the first child of its parent
+        :param reduce: whether it can be searched one depth shallower
+        """
+        if first:
+            return value_function(game, state, depth, a, b)
+        if reduce:
+            self.reductions += 1
+            value, action = self.scout(value_function, game, state,
+                                       depth + 1, a, b, maximise)
+            if (value <= a) if maximise else (value >= b):
+                return value, action
+            self.researches += 1
+        return self.scout(value_function, game, state, depth, a, b, maximise)
+
+    def can_reduce(self, depth, searched, quiet):
+        """
+        Whether a move can be searched shallower by late move reduction
+        :param searched: number of moves already searched in the node
+        """
+        return self.late_move_reduction is not None and quiet and \
+            searched >= self.late_move_reduction and \
+            self.terminal_test.max_depth - depth >= 2
+
+    def futility_value(self, state, depth, a, b, maximise):
+        """
+        Bound on the value of the quiet moves of a node at the last depth
+        before the horizon
+        :return: the bound, or None if the quiet moves have to be searched
+        """
+        if self.futility_margin is None or depth == 0 or \
+                self.terminal_test.max_depth - depth != 1:
+            return None
+        value = self.state_value(state)
+        if maximise and value + self.futility_margin <= a:
+            return value + self.futility_margin
+        if not maximise and value - self.futility_margin >= b:
+            return value - self.futility_margin
+        return None
+
+    def capture_red(self, game, state, action):
+        """
+        Whether an action jumps over a red piece
+        """
+        if action[2] != "JUMP":
+            return False
+        jumping_colour, jumpedover_colour = \
+            game.jump_action_classification(state, action)
+        return jumpedover_colour == "red"
+
     # def min_value(self, game, state, depth, a, b):
     #     if self.terminal_test(state, depth):
     #         return self.utility_generator(state)("red"), None
@@ -49,116 +392,169 @@ class AlphaBetaSearch(Search):
     #     return value, None
 
     def min_value(self, game, state, depth, a, b):
+        self.nodes += 1
+        key = hash(state)
+        a_0, b_0 = a, b
+        cut_value, a, b, table_action = self.probe(key, depth, a, b)
+        if cut_value is not None:
+            return cut_value, None
         if self.terminal_test(state, depth):
-            return self.utility_generator(state)("red"), None
+            value = self.horizon_value(game, state, a, b)
+            self.store(key, depth, value, a_0, b_0, None)
+            return value, None
+        node_depth = depth
         depth += 1
         value = +inf
-        actions = game.actions(state)
-        states = list(map(lambda x: game.result(state, x), actions))
-
-        actions_states = list(zip(actions, states))
-        actions_states = filter(lambda x: x[0][2] == "JUMP", actions_states)
-        for green_action, state_1 in actions_states:
-            jumping_colour, jumpedover_colour = \
-                game.jump_action_classification(state, green_action)
-            if jumpedover_colour != "red":
-                continue
-            actions_1 = game.actions(state_1)
-            states_1 = map(lambda x: game.result(state_1, x), actions_1)
-            actions_states = list(zip(actions_1, states_1))
-            actions_states = filter(lambda x: x[0][2] == "JUMP",
-                                    actions_states)
-
-            for blue_action, state_2 in actions_states:
-                jumping_colour, jumpedover_colour = \
-                    game.jump_action_classification(state_1, blue_action)
-                if jumpedover_colour != "red":
+        best_action = None
+        full_width = self.quiescence_depth is not None
+
+        green = state.colour
+        if not full_width:
+            green_actions = self.ordered_actions(game, state, node_depth)
+            for green_action in self.move_first(green_actions,
+                                                table_action):
+                if not self.capture_red(game, state, green_action):
                     continue
-                new_value, opponent_action = self.max_value(game, state_2,
-                                                            depth, a, b)
-                if self.debug:
-                    print(f'{depth} {green_action} {blue_action} '
-                          f'{float(new_value):.3}')
-                value = min(value, new_value)
-                if value <= a:
-                    return value, None
-                b = min(b, value)
-        if value != +inf:
-            return value, None
+                state_1, token_1 = self.make(game, state, green_action)
+                blue = state_1.colour
+                for blue_action in self.ordered_actions(game, state_1,
+                                                        node_depth):
+                    if not self.capture_red(game, state_1, blue_action):
+                        continue
+                    state_2, token_2 = self.make(game, state_1, blue_action)
+                    new_value, opponent_action = self.search_child(
+                        self.max_value, game, state_2, depth, a, b, False,
+                        best_action is None)
+                    self.unmake(game, state_2, token_2)
+                    if self.debug:
+                        print(f'{depth} {green_action} {blue_action} '
+                              f'{float(new_value):.3}')
+                    if new_value < value:
+                        best_action = green_action
+                        value = new_value
+                    if value <= a:
+                        self.unmake(game, state_1, token_1)
+                        self.record_cutoff(node_depth, green, green_action)
+                        self.record_cutoff(node_depth, blue, blue_action)
+                        self.store(key, node_depth, value, a_0, b_0,
+                                   best_action)
+                        return value, None
+                    b = min(b, value)
+                self.unmake(game, state_1, token_1)
+            if value != +inf:
+                self.store(key, node_depth, value, a_0, b_0, best_action)
+                return value, None
 
-        actions_states = map(lambda x:
-                             (self.state_value(x[1]),
-                              random(), x[0], x[1]), zip(actions, states))
-        actions_states = sorted(actions_states)
-
-        for _, _, green_action, state_1 in actions_states[:1]:
-            actions = game.actions(state_1)
-            states = map(lambda x: game.result(state_1, x), actions)
-            actions_states = map(lambda x:
-                                 (self.state_value(x[1]),
-                                  random(), x[0], x[1]), zip(actions, states))
-            actions_states = sorted(actions_states)
-
-            for _, _, blue_action, state_2 in actions_states[:1]:
-                new_value, opponent_action = self.max_value(game, state_2,
-                                                            depth, a, b)
+        # Only the best reply by static evaluation, unless full width
+        replies = None if full_width else 1
+        cutoff = False
+        searched = 0
+        futile = self.futility_value(state, node_depth, a, b, False)
+        for _, _, green_action, state_1 in self.reply_children(
+                game, state, node_depth, table_action)[:replies]:
+            green_quiet = not game.noisy(state, green_action)
+            state_1, token_1 = self.make(game, state, green_action, state_1)
+            blue = state_1.colour
+            for _, _, blue_action, state_2 in self.reply_children(
+                    game, state_1, node_depth)[:replies]:
+                quiet = green_quiet and \
+                    not game.noisy(state_1, blue_action)
+                if quiet and futile is not None:
+                    self.futility_prunes += 1
+                    value = min(value, futile)
+                    continue
+                state_2, token_2 = self.make(game, state_1, blue_action,
+                                             state_2)
+                new_value, opponent_action = self.search_child(
+                    self.max_value, game, state_2, depth, a, b, False,
+                    best_action is None,
+                    self.can_reduce(node_depth, searched, quiet))
+                searched += 1
+                self.unmake(game, state_2, token_2)
                 if self.debug:
                     print(f'{depth} {green_action} {blue_action} '
                           f'{float(new_value):.3}')
-                value = min(value, new_value)
+                if new_value < value:
+                    best_action = green_action
+                    value = new_value
                 if value <= a:
-                    return value, None
+                    self.record_cutoff(node_depth, green, green_action)
+                    self.record_cutoff(node_depth, blue, blue_action)
+                    cutoff = True
+                    break
                 b = min(b, value)
+            self.unmake(game, state_1, token_1)
+            if cutoff:
+                break
+        self.store(key, node_depth, value, a_0, b_0, best_action)
         return value, None
 
     def max_value(self, game, state, depth, a, b):
+        self.nodes += 1
+        key = hash(state)
+        a_0, b_0 = a, b
+        cut_value, a_1, b_1, table_action = self.probe(key, depth, a, b)
+        # the root always has to be searched to find an action
+        if depth != 0:
+            if cut_value is not None:
+                return cut_value, table_action
+            a, b = a_1, b_1
         if self.terminal_test(state, depth):
-            return self.utility_generator(state)("red"), None
+            value = self.horizon_value(game, state, a, b)
+            self.store(key, depth, value, a_0, b_0, None)
+            return value, None
+        node_depth = depth
         depth += 1
         value = -inf
         best_action = None
+        root = depth == 1
+        full_width = self.quiescence_depth is not None
 
-        actions = game.actions(state)
-        states = list(map(lambda x: game.result(state, x), actions))
-        actions_states = map(lambda x:
-                             (self.state_value(x[1]),
-                              random(), x[0], x[1]), zip(actions, states))
-        actions_states = sorted(actions_states, reverse=True)
+        if root or not self.dynamic_ordering:
+            actions_states = self.sorted_children(game, state, reverse=True)
+        else:
+            actions_states = [(None, None, action, None) for action
+                              in self.ordered_actions(game, state, node_depth)]
+        actions_states = self.move_first(actions_states, table_action,
+                                         lambda x: x[2])
 
-        if depth == 1:
+        if root and not full_width:
             for _, _, action, child in actions_states:
                 jump_type = game.jump_action_classification(state, action)
                 if jump_type is not None and jump_type[0] != jump_type[1]:
                     break
             else:
                 depth = self.terminal_test.max_depth - 1
-            for _, _, action, child in actions_states:
-                new_value, opponent_action = self.min_value(game, child,
-                                                            depth, a, b)
-                if self.debug:
-                    print(f'{depth} {action} {float(new_value):.3}')
-                if new_value > value:
-                    best_action = action
-                    value = new_value
-                # opponent won't allow you to chose a better move
-                if value >= b:
-                    return value, best_action
-                a = max(a, value)
-        # No need to search for the best one
-        else:
-            for _, _, action, child in actions_states:
-                if action[2] in ["JUMP", "EXIT"]:
-                    new_value, opponent_action = self.min_value(game, child,
-                                                                depth, a, b)
-                    if self.debug:
-                        print(f'{depth} {action} {float(new_value):.3}')
-                    if new_value > value:
-                        best_action = action
-                        value = new_value
-                    # opponent won't allow you to chose a better move
-                    if value >= b:
-                        return value, best_action
-                    a = max(a, value)
+                self.selective_root = True
+        searched = 0
+        futile = self.futility_value(state, node_depth, a, b, True)
+        for _, _, action, child in actions_states:
+            # No need to search for the best one below the root
+            if not (root or full_width) and action[2] not in ["JUMP", "EXIT"]:
+                continue
+            quiet = not game.noisy(state, action)
+            if quiet and futile is not None:
+                self.futility_prunes += 1
+                value = max(value, futile)
+                continue
+            child, token = self.make(game, state, action, child)
+            new_value, opponent_action = self.search_child(
+                self.min_value, game, child, depth, a, b, True,
+                best_action is None,
+                not root and self.can_reduce(node_depth, searched, quiet))
+            searched += 1
+            self.unmake(game, child, token)
+            if self.debug:
+                print(f'{depth} {action} {float(new_value):.3}')
+            if new_value > value:
+                best_action = action
+                value = new_value
+            # opponent won't allow you to chose a better move
+            if value >= b:
+                self.record_cutoff(node_depth, state.colour, action)
+                break
+            a = max(a, value)
+        self.store(key, node_depth, value, a_0, b_0, best_action)
         return value, best_action
 
     # def max_value(self, game, state, depth, a, b):
@@ -190,7 +586,69 @@ class AlphaBetaSearch(Search):
     #         a = max(a, value)
     #     return value, best_action
 
+    def aspiration_search(self, game, state, depth, guess):
+        """
+        Search the root with a window around the guessed value
+        :param guess: value of the previous iteration, None if there is none
+        """
+        if self.aspiration_window is None or guess is None or \
+                guess in (-inf, inf):
+            return self.max_value(game, state, depth, -inf, inf)
+        a = guess - self.aspiration_window
+        b = guess + self.aspiration_window
+        value, action = self.max_value(game, state, depth, a, b)
+        if a < value < b:
+            return value, action
+        self.aspiration_failures += 1
+        return self.max_value(game, state, depth, -inf, inf)
+
+    def iterative_deepening(self, game, state, depth):
+        """
+        Search with max depth 1, 2, ... until the time budget is used up.
+        If even the first iteration runs out of time, the best action by
+        static ordering is played.
+        """
+        start = process_time()
+        terminal_test = self.terminal_test
+        self.principal_variation = {}
+        self.depth_reached = None
+        best_v = None
+        # Ordered before searching, a timed out make/unmake search leaves
+        # the state in the middle of a line
+        best_action = self.sorted_children(game, state, reverse=True)[0][2]
+        self.deadline = start + self.time_budget
+        try:
+            for max_depth in range(depth + 1, terminal_test.max_depth + 1):
+                iteration_start = process_time()
+                self.terminal_test = copy(terminal_test)
+                self.terminal_test.max_depth = max_depth
+                self.selective_root = False
+                try:
+                    best_v, best_action = self.aspiration_search(
+                        game, state, depth, best_v)
+                except SearchTimeout:
+                    break
+                self.depth_reached = max_depth
+                if self.debug:
+                    print(f'Depth {max_depth} best utility is {best_v}')
+                if self.selective_root:
+                    break
+                # The next iteration is more expensive than this one
+                used = process_time()
+                if used - iteration_start > self.deadline - used:
+                    break
+        finally:
+            self.terminal_test = terminal_test
+            self.deadline = None
+        return best_action
+
     def search(self, game, state, depth=0):
+        self.killers.clear()
+        self.history.clear()
+        if self.make_unmake:
+            state = SearchState.from_state(state)
+        if self.time_budget is not None:
+            return self.iterative_deepening(game, state, depth)
         best_v, best_action = self.max_value(game, state, depth, -inf, inf)
         if (self.debug):
             print('Best utility is', best_v)
@@ -0,0 +1,98 @@
+from math import inf
+from random import random
+from artificial_idiot.search.search import Search
+from artificial_idiot.game.game import PASS_ACTION
+
+
+class NegamaxSearch(Search):
+    """
+    Two player alpha beta search in negamax form, for when a colour has no
+    pieces left. The eliminated colour can only pass, so its plies are
+    skipped and every depth is a move of one of the two remaining players.
+    """
+
+    def __init__(self, utility_generator, terminal_test):
+        """
+        :param utility_generator: evaluator generator, valued for the player
+            to move at the root
+        :param terminal_test: cutoff test (state, depth) -> bool
+        """
+        self.utility_generator = utility_generator
+        self.terminal_test = terminal_test
+        # the searching player and the two colours that still have pieces
+        self.player = None
+        self.players = None
+        self.nodes = 0
+        self.debug = False
+
+    @staticmethod
+    def remaining_players(state):
+        """
+        Colours that still have pieces on the board
+        """
+        return [colour for colour in state.code_map
+                if state.piece_to_pos.get(colour)]
+
+    def state_value(self, state, player):
+        """
+        Value of a state for a player. The game is zero sum between the two
+        players, so the opponent values it as the negative of the evaluation
+        of the searching player
+        """
+        value = self.utility_generator(state)(self.player)
+        return value if player == self.player else -value
+
+    def children(self, game, state):
+        """
+        (value, action, child) where the eliminated colour has already
+        passed, sorted by static evaluation for the player to move
+        """
+        player = state.colour
+        children = []
+        for action in game.actions(state):
+            child = game.result(state, action)
+            while child.colour not in self.players:
+                child = game.result(child, PASS_ACTION)
+            children.append((action, child))
+        return [(value, action, child) for value, _, action, child in sorted(
+            ((self.state_value(child, player), random(), action, child)
+             for action, child in children), reverse=True)]
+
+    def negamax(self, game, state, depth, a, b):
+        """
+        :return: value of the state for the player to move, and its best
+            action
+        """
+        self.nodes += 1
+        if self.terminal_test(state, depth) or game.terminal_state(state):
+            return self.state_value(state, state.colour), None
+        value = -inf
+        best_action = None
+        for new_value, action, child in self.children(game, state):
+            # The static value used for ordering is already the value of a
+            # leaf, so it is not evaluated again
+            if not (self.terminal_test(child, depth + 1) or
+                    game.terminal_state(child)):
+                new_value, _ = self.negamax(game, child, depth + 1, -b, -a)
+                # the child is valued for the opponent
+                new_value = -new_value
+            if self.debug:
+                print(f'{depth} {action} {float(new_value):.3}')
+            if new_value > value:
+                best_action = action
+                value = new_value
+            a = max(a, value)
+            if a >= b:
+                break
+        return value, best_action
+
+    def search(self, game, state, depth=0, **kwargs):
+        self.player = state.colour
+        self.players = self.remaining_players(state)
+        if len(self.players) != 2 or state.colour not in self.players:
+            raise ValueError(f"{self.players} are left, negamax needs "
+                             f"exactly two players including the mover")
+        best_v, best_action = self.negamax(game, state, depth, -inf, inf)
+        if self.debug:
+            print('Best utility is', best_v)
+        return best_action
@@ -0,0 +1,133 @@
+from collections import defaultdict
+from multiprocessing import Pipe, Process
+import os
+import random
+from artificial_idiot.search.search import Search
+from artificial_idiot.search.uct import UCTSearch
+from artificial_idiot.game.node import BasicUCTNode
+from artificial_idiot.game.game import NodeGame
+
+
+def uct_worker(connection, state, c, node_type, evaluator, node_budget):
+    """
+    Keep a tree of its own from the current root. Messages are
+        ("update", colour, action) -> move the root, nothing is sent back
+        ("search", iteration, max_time) -> {action: (visits, wins)} of the
+            children of the root, and the number of nodes of the tree
+        None -> exit
+    """
+    # Forked workers would otherwise play the same playouts
+    random.seed()
+    game = NodeGame("red", node_type(state))
+    search = UCTSearch(c, node_type, evaluator, iteration=None,
+                       early_stopping=False, node_budget=node_budget)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        if message[0] == "update":
+            _, colour, action = message
+            game.update(colour, action)
+        elif message[0] == "search":
+            _, iteration, max_time = message
+            search.search(game, game.initial_state, iteration,
+                          max_time=max_time)
+            connection.send(({action: (child.visits, child.wins) for
+                              action, child in
+                              game.initial_state.children.items()},
+                             search.nodes))
+    connection.close()
+
+
+class RootParallelUCTSearch(Search):
+    """
+    Root parallel UCT. Every worker process searches a tree of its own from
+    the same root, and the visits of the children of the root are summed up
+    to pick the move.
+    The workers are started on the first search and kept for the whole game,
+    the moves of all players have to be sent with update.
+    """
+
+    def __init__(self, workers=None, c=2, node_type=BasicUCTNode,
+                 evaluator=None, iteration=None, max_time=1,
+                 node_budget=20000):
+        """
+        :param workers: number of worker processes, one per core by default
+        :param c: exploration constant of UCB
+        :param node_type: node class of the trees
+        :param evaluator: (state, player) -> result of a playout
+        :param iteration: number of playouts of each worker per search
+        :param max_time: CPU seconds of each worker per search
+        :param node_budget: maximum number of nodes of the tree of each
+            worker, which is kept for the whole game. None for no limit
+        """
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.c = c
+        self.node_type = node_type
+        self.evaluator = evaluator
+        self.iteration = iteration
+        self.max_time = max_time
+        self.node_budget = node_budget
+        self.processes = []
+        self.connections = []
+        # summed statistics of the children of the root and nodes of all
+        # trees in the last search
+        self.statistics = {}
+        self.nodes = 0
+
+    def start(self, state):
+        """
+        Start the workers from a root state
+        """
+        for _ in range(self.workers):
+            connection, worker_connection = Pipe()
+            process = Process(target=uct_worker,
+                              args=(worker_connection, state, self.c,
+                                    self.node_type, self.evaluator,
+                                    self.node_budget),
+                              daemon=True)
+            process.start()
+            worker_connection.close()
+            self.processes.append(process)
+            self.connections.append(connection)
+
+    def update(self, colour, action):
+        """
+        Tell the workers about an action of any player, in the perspective of
+        the search
+        """
+        for connection in self.connections:
+            connection.send(("update", colour, action))
+
+    def close(self):
+        for connection in self.connections:
+            connection.send(None)
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.processes = []
+        self.connections = []
+
+    def search(self, game, state, iteration=None, max_time=None, **kwargs):
+        """
+        :param state: the root, only used to start the workers
+        :return: the action with the most visits over all workers
+        """
+        if iteration is None:
+            iteration = self.iteration
+        if max_time is None:
+            max_time = self.max_time
+        if not self.processes:
+            self.start(state)
+        for connection in self.connections:
+            connection.send(("search", iteration, max_time))
+        statistics = defaultdict(lambda: [0, 0])
+        self.nodes = 0
+        for connection in self.connections:
+            children, nodes = connection.recv()
+            self.nodes += nodes
+            for action, (visits, wins) in children.items():
+                statistics[action][0] += visits
+                statistics[action][1] += wins
+        self.statistics = dict(statistics)
+        return max(self.statistics.items(), key=lambda x: x[1][0])[0]
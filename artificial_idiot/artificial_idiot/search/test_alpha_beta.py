@@ -1,10 +1,16 @@
 from unittest import TestCase
+from unittest.mock import patch
 from artificial_idiot.game.game import Game
 from artificial_idiot.game.state import State
 from artificial_idiot.evaluation.evaluator_generator import NaiveEvaluatorGenerator, MinimaxEvaluator
 from artificial_idiot.util.json_parser import JsonParser
 from artificial_idiot.search.mini_max import AlphaBetaSearch
 from artificial_idiot.search.search_cutoff.cutoff import DepthLimitCutoff
+from artificial_idiot.search.max_n import MaxN
+import random
+from itertools import count
+from time import process_time
+from math import inf
 import json
 
 
@@ -156,3 +162,165 @@ class TestParnoidPlayer(TestCase):
         game = Game('red', state)
         best_action = search.search(game, state)
         print(best_action)
+
+
+class AlphaBetaTestMixin:
+    """
+    Searches with the options of a TestCase that it is mixed into, and the
+    positions every option of AlphaBetaSearch should still get right
+    """
+    weights = [1000, -10, 40, -1000, 10, 0, 1000, 10, 50, -10]
+    evaluator_generator = MinimaxEvaluator(weights)
+    max_depth = 4
+    # keyword arguments of AlphaBetaSearch
+    options = {}
+
+    def make_search(self, **kwargs):
+        """
+        :param kwargs: options that override those of the TestCase
+        """
+        return AlphaBetaSearch(self.evaluator_generator,
+                               DepthLimitCutoff(self.max_depth),
+                               **{**self.options, **kwargs})
+
+    def search(self, file_name, **kwargs):
+        state = parse_state(f"../../tests/{file_name}.json")
+        return self.make_search(**kwargs).search(Game('red', state), state)
+
+    def test_must_exit(self):
+        self.assertEqual('EXIT', self.search("must_exit_0")[-1])
+
+    def test_eat_green(self):
+        self.assertTupleEqual(((0, 0), (2, -2), 'JUMP'),
+                              self.search("eat_green"))
+
+
+class TestMakeUnmake(AlphaBetaTestMixin, TestCase):
+    options = {"make_unmake": True}
+    files = ["red_initial_state", "eat_green", "avoid_eaten", "jump",
+             "must_exit_0", "pass"]
+
+    def test_alpha_beta(self):
+        for file_name in self.files:
+            actions = []
+            for make_unmake in (False, True):
+                random.seed(0)
+                actions.append(self.search(file_name,
+                                           make_unmake=make_unmake))
+            self.assertEqual(actions[0], actions[1])
+
+    def test_max_n(self):
+        evaluator_generator = NaiveEvaluatorGenerator([10, 100, 1])
+        for file_name in self.files:
+            state = parse_state(f"../../tests/{file_name}.json")
+            game = Game('red', state)
+            actions = [MaxN(evaluator_generator, DepthLimitCutoff(3), 3,
+                            make_unmake).search(game, state)
+                       for make_unmake in (False, True)]
+            self.assertEqual(actions[0], actions[1])
+
+
+class TestIterativeDeepening(AlphaBetaTestMixin, TestCase):
+    max_depth = 20
+    options = {"time_budget": 1}
+
+    def test_budget(self):
+        search = self.make_search(time_budget=0.3)
+        state = parse_state("../../tests/jump.json")
+        start = process_time()
+        action = search.search(Game('red', state), state)
+        self.assertLess(process_time() - start, 0.35)
+        self.assertIsNotNone(action)
+        self.assertGreaterEqual(search.depth_reached, 1)
+        # the search is left ready for a fixed depth search
+        self.assertEqual(20, search.terminal_test.max_depth)
+        self.assertIsNone(search.deadline)
+
+    def test_tiny_budget(self):
+        # the first iteration is cut short too, even with quiescence and
+        # reductions on top
+        search = self.make_search(time_budget=0.5, quiescence_depth=4,
+                                  late_move_reduction=16, futility_margin=300)
+        state = parse_state("../../tests/busy.json")
+        game = Game('red', state)
+        # a clock that runs past the budget at the first read in the search
+        with patch("artificial_idiot.search.mini_max.process_time",
+                   count().__next__):
+            action = search.search(game, state)
+        self.assertIsNone(search.depth_reached)
+        # the best action by static ordering, ties are broken at random
+        best = max(search.state_value(child)
+                   for _, child in game.successors(state))
+        self.assertEqual(best,
+                         search.state_value(game.result(state, action)))
+
+
+class TestDynamicOrdering(AlphaBetaTestMixin, TestCase):
+    options = {"dynamic_ordering": True}
+
+    def test_fewer_evaluations(self):
+        state = parse_state("../../tests/avoid_eaten.json")
+        searches = []
+        for dynamic_ordering in (False, True):
+            search = self.make_search(dynamic_ordering=dynamic_ordering)
+            random.seed(0)
+            search.search(Game('red', state), state)
+            searches.append(search)
+        static, dynamic = searches
+        self.assertGreater(dynamic.nodes, 0)
+        self.assertLessEqual(dynamic.evaluations, static.evaluations)
+
+
+class TestPrincipalVariationSearch(AlphaBetaTestMixin, TestCase):
+    options = {"dynamic_ordering": True, "principal_variation_search": True}
+
+    def test_same_value(self):
+        state = parse_state("../../tests/avoid_eaten.json")
+        game = Game('red', state)
+        values = []
+        for pvs in (False, True):
+            search = self.make_search(principal_variation_search=pvs)
+            random.seed(0)
+            values.append(search.max_value(game, state, 0, -inf, inf)[0])
+        self.assertAlmostEqual(values[0], values[1])
+
+
+class TestAspirationWindow(AlphaBetaTestMixin, TestCase):
+    options = {"dynamic_ordering": True, "principal_variation_search": True,
+               "time_budget": 1, "aspiration_window": 100}
+
+
+class TestQuiescence(AlphaBetaTestMixin, TestCase):
+    max_depth = 2
+    options = {"dynamic_ordering": True, "quiescence_depth": 4}
+
+    def test_eat_blue(self):
+        self.assertTupleEqual(((0, 0), (2, -2), 'JUMP'),
+                              self.search("eat_blue"))
+
+    def test_avoid_eaten(self):
+        self.assertTupleEqual(((-2, -1), (-3, 0), 'MOVE'),
+                              self.search("avoid_eaten"))
+
+
+class TestReductions(AlphaBetaTestMixin, TestCase):
+    max_depth = 3
+    options = {"dynamic_ordering": True, "quiescence_depth": 4,
+               "late_move_reduction": 16, "futility_margin": 300}
+
+    def test_jump(self):
+        self.assertTupleEqual(((0, 0), (2, -2), 'JUMP'), self.search("jump"))
+
+    def test_eat_blue(self):
+        self.assertTupleEqual(((0, 0), (2, -2), 'JUMP'),
+                              self.search("eat_blue"))
+
+    def test_avoid_eaten(self):
+        self.assertTupleEqual(((-2, -1), (-3, 0), 'MOVE'),
+                              self.search("avoid_eaten"))
+
+    def test_should_not_exit(self):
+        self.assertNotEqual('EXIT', self.search("should_not_exit")[-1])
+
+    def test_pass(self):
+        self.assertTupleEqual((None, None, 'PASS'), self.search("pass"))
@@ -0,0 +1,43 @@
+from unittest import TestCase
+from artificial_idiot.game.game import Game
+from artificial_idiot.game.state import State
+from artificial_idiot.game.tree_arena import ROOT
+from artificial_idiot.util.json_parser import JsonParser
+from artificial_idiot.search.arena_uct import ArenaUCTSearch
+from artificial_idiot.player import ArenaUCTPlayer
+import json
+
+
+def parse_state(file_name):
+    f = open(file_name)
+    pos_dict, colour, completed = JsonParser(json.load(f)).parse()
+    return State(pos_dict, colour, completed)
+
+
+class TestArenaUCTSearch(TestCase):
+
+    def test_iteration_budget(self):
+        state = parse_state("../../tests/must_exit_1.json")
+        game = Game("red", state)
+        search = ArenaUCTSearch(capacity=8, iteration=200)
+        action = search.search(game, state)
+        self.assertIn(action, game.actions(state))
+        tree = search.tree
+        self.assertEqual(200, search.playouts)
+        self.assertEqual(200, tree.visits[ROOT])
+        children = tree.children(ROOT)
+        self.assertEqual(200, tree.visits[children.start:children.stop].sum())
+        self.assertGreater(tree.capacity, 8)
+
+    def test_must_exit(self):
+        # the win in one exit is found
+        state = parse_state("../../tests/exit.json")
+        state.completed["red"] = 3
+        game = Game("red", state)
+        search = ArenaUCTSearch(iteration=100)
+        self.assertEqual("EXIT", search.search(game, state)[-1])
+
+    def test_player(self):
+        player = ArenaUCTPlayer("green", iteration=20)
+        action = player.action()
+        player.update("green", action)
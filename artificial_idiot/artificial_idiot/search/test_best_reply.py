@@ -0,0 +1,54 @@
+from unittest import TestCase
+from artificial_idiot.game.game import Game
+from artificial_idiot.game.state import State
+from artificial_idiot.evaluation.evaluator_generator import MinimaxEvaluator
+from artificial_idiot.util.json_parser import JsonParser
+from artificial_idiot.search.best_reply import BestReplySearch
+from artificial_idiot.search.search_cutoff.cutoff import DepthLimitCutoff
+import json
+
+
+def parse_state(file_name):
+    f = open(file_name)
+    pos_dict, colour, completed = JsonParser(json.load(f)).parse()
+    return State(pos_dict, colour, completed)
+
+
+class TestBestReplySearch(TestCase):
+    weights = [1000, -10, 40, -1000, 10, 0, 1000, 10, 50, -10]
+    evaluator_generator = MinimaxEvaluator(weights)
+    search = BestReplySearch(evaluator_generator, DepthLimitCutoff(4))
+
+    def best_action(self, file_name):
+        state = parse_state(f"../../tests/{file_name}.json")
+        return self.search.search(Game('red', state), state)
+
+    def test_must_exit(self):
+        self.assertEqual('EXIT', self.best_action("must_exit_0")[-1])
+
+    def test_eat_green(self):
+        self.assertTupleEqual(((0, 0), (2, -2), 'JUMP'),
+                              self.best_action("eat_green"))
+
+    def test_eat_blue(self):
+        self.assertTupleEqual(((0, 0), (2, -2), 'JUMP'),
+                              self.best_action("eat_blue"))
+
+    def test_avoid_eaten(self):
+        self.assertTupleEqual(((-2, -1), (-3, 0), 'MOVE'),
+                              self.best_action("avoid_eaten"))
+
+    def test_pass(self):
+        self.assertTupleEqual((None, None, 'PASS'), self.best_action("pass"))
+
+    def test_opponent_children(self):
+        state = parse_state("../../tests/red_initial_state.json")
+        game = Game('red', state)
+        child = game.result(state, game.actions(state)[0])
+        children = self.search.opponent_children(game, child)
+        # every move of green and of blue, and red moves next
+        green = game.actions(child)
+        blue = game.actions(game.result(child, (None, None, "PASS")))
+        self.assertEqual(len(green) + len(blue), len(children))
+        for action, grandchild in children:
+            self.assertEqual('red', grandchild.colour)
@@ -0,0 +1,52 @@
+from unittest import TestCase
+from math import log, sqrt
+from artificial_idiot.game.game import Game
+from artificial_idiot.game.state import State
+from artificial_idiot.util.json_parser import JsonParser
+from artificial_idiot.search.dag_uct import DAGUCTSearch
+from artificial_idiot.player import DAGUCTPlayer
+import json
+
+
+def parse_state(file_name):
+    f = open(file_name)
+    pos_dict, colour, completed = JsonParser(json.load(f)).parse()
+    return State(pos_dict, colour, completed)
+
+
+class TestDAGUCTSearch(TestCase):
+
+    def test_transpositions(self):
+        state = parse_state("../../tests/red_initial_state.json")
+        game = Game("red", state)
+        search = DAGUCTSearch(iteration=1000, rollout_depth=4)
+        action = search.search(game, state)
+        self.assertIn(action, game.actions(state))
+        self.assertGreater(search.merge_rate, 0)
+        # every position has a single node
+        nodes = list(search.table.values())
+        self.assertEqual(len(nodes), len({node.state for node in nodes}))
+        edges = sum(len(node.edges) for node in nodes)
+        self.assertEqual(search.edges, edges)
+        self.assertEqual(edges - search.merges + 1, search.nodes)
+        root = search.table[state]
+        self.assertEqual(1000, root.visits)
+        self.assertEqual(1000, sum(visits for _, visits
+                                   in root.edges.values()))
+
+    def test_edge_value(self):
+        state = parse_state("../../tests/red_initial_state.json")
+        game = Game("red", state)
+        search = DAGUCTSearch(iteration=200, rollout_depth=4)
+        search.search(game, state)
+        root = search.table[state]
+        action, (child, visits) = root.best_edge()
+        # the child is valued over all its paths, explored by the edge
+        self.assertEqual(child.wins / child.visits +
+                         sqrt(2 * log(200) / visits),
+                         root.edge_value(root.edges[action], 200))
+
+    def test_player(self):
+        player = DAGUCTPlayer("green", iteration=20)
+        action = player.action()
+        player.update("green", action)
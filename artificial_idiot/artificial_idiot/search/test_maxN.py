@@ -2,7 +2,7 @@ from unittest import TestCase
 from artificial_idiot.game.game import Game
 from artificial_idiot.game.state import State
 from artificial_idiot.evaluation.evaluator_generator import (
-    NaiveEvaluatorGenerator, AdvanceEG
+    NaiveEvaluatorGenerator, AdvanceEG, ConstantSumEvaluatorGenerator
 )
 from artificial_idiot.util.json_parser import JsonParser
 from artificial_idiot.search.max_n import MaxN
@@ -158,4 +158,27 @@ class TestMyMaxN(TestCase):
         print(state)
         game = Game('blue', state)
         best_action = search.search(game, state)
-        self.assertTupleEqual((None, None, 'PASS'), best_action)
\ No newline at end of file
+        self.assertTupleEqual((None, None, 'PASS'), best_action)
+
+
+class TestMaxNPruning(TestCase):
+    evaluator_generator = ConstantSumEvaluatorGenerator(
+        NaiveEvaluatorGenerator([10, 100, 1]))
+    files = ["eat_green", "avoid_eaten", "jump", "eat_blue"]
+
+    def search(self, file_name, **kwargs):
+        search = MaxN(self.evaluator_generator, DepthLimitCutoff(4), 3,
+                      **kwargs)
+        state = parse_state(f"../../tests/{file_name}.json")
+        return search.search(Game('red', state), state), search
+
+    def test_same_action(self):
+        for file_name in self.files:
+            action, full = self.search(file_name)
+            for kwargs in ({"max_sum": 1},
+                           {"max_sum": 1, "speculative": True},
+                           {"max_sum": 1, "speculative": True,
+                            "make_unmake": True}):
+                pruned_action, pruned = self.search(file_name, **kwargs)
+                self.assertEqual(action, pruned_action)
+                self.assertLessEqual(pruned.nodes, full.nodes)
@@ -0,0 +1,64 @@
+from unittest import TestCase
+from math import inf
+from artificial_idiot.game.game import Game
+from artificial_idiot.game.state import State
+from artificial_idiot.evaluation.evaluator_generator import MinimaxEvaluator
+from artificial_idiot.util.json_parser import JsonParser
+from artificial_idiot.search.negamax import NegamaxSearch
+from artificial_idiot.search.search_cutoff.cutoff import DepthLimitCutoff
+import json
+
+
+def parse_state(file_name):
+    f = open(file_name)
+    pos_dict, colour, completed = JsonParser(json.load(f)).parse()
+    return State(pos_dict, colour, completed)
+
+
+class TestNegamaxSearch(TestCase):
+    weights = [1000, -10, 40, -1000, 10, 0, 1000, 10, 50, -10]
+    evaluator_generator = MinimaxEvaluator(weights)
+
+    def setUp(self):
+        self.search = NegamaxSearch(self.evaluator_generator,
+                                    DepthLimitCutoff(4))
+
+    def best_action(self, file_name):
+        state = parse_state(f"../../tests/{file_name}.json")
+        return self.search.search(Game('red', state), state)
+
+    def minimax(self, game, state, depth, max_depth):
+        """
+        Paranoid minimax for red without pruning, blue passes
+        """
+        if depth == max_depth or 4 in state.completed.values():
+            return self.evaluator_generator(state)("red")
+        if state.colour == "blue":
+            return self.minimax(game, game.result(state, (None, None, "PASS")),
+                                depth, max_depth)
+        values = [self.minimax(game, child, depth + 1, max_depth)
+                  for _, child in game.successors(state)]
+        return max(values) if state.colour == "red" else min(values)
+
+    def test_remaining_players(self):
+        state = parse_state("../../tests/bug0.json")
+        self.assertListEqual(["red", "green"],
+                             NegamaxSearch.remaining_players(state))
+
+    def test_same_value_as_minimax(self):
+        state = parse_state("../../tests/bug0.json")
+        game = Game('red', state)
+        self.search.player = "red"
+        self.search.players = ["red", "green"]
+        value, _ = self.search.negamax(game, state, 0, -inf, inf)
+        self.assertEqual(self.minimax(game, state, 0, 4), value)
+
+    def test_skip_eliminated(self):
+        # green has no pieces, every depth is a move of red or blue
+        self.assertTupleEqual(((-1, -2), (0, -3), 'MOVE'),
+                              self.best_action("jump_ans"))
+        self.assertLess(self.search.nodes, 100)
+
+    def test_three_players(self):
+        with self.assertRaises(ValueError):
+            self.best_action("eat_green")
@@ -0,0 +1,60 @@
+from unittest import TestCase
+from artificial_idiot.game.game import Game
+from artificial_idiot.game.state import State
+from artificial_idiot.util.json_parser import JsonParser
+from artificial_idiot.search.root_parallel import RootParallelUCTSearch
+from artificial_idiot.player import RootParallelUCTPlayer
+import json
+
+
+def parse_state(file_name):
+    f = open(file_name)
+    pos_dict, colour, completed = JsonParser(json.load(f)).parse()
+    return State(pos_dict, colour, completed)
+
+
+class TestRootParallelUCTSearch(TestCase):
+
+    def test_summed_visits(self):
+        state = parse_state("../../tests/must_exit_1.json")
+        game = Game("red", state)
+        search = RootParallelUCTSearch(workers=2, iteration=20,
+                                       max_time=None)
+        try:
+            action = search.search(game, state)
+            visits = [visits for visits, _ in search.statistics.values()]
+            self.assertEqual(40, sum(visits))
+            self.assertEqual(max(visits), search.statistics[action][0])
+        finally:
+            search.close()
+
+    def test_node_budget(self):
+        state = parse_state("../../tests/red_initial_state.json")
+        game = Game("red", state)
+        search = RootParallelUCTSearch(workers=2, iteration=100,
+                                       max_time=None, node_budget=30)
+        try:
+            action = search.search(game, state)
+            self.assertLessEqual(search.nodes, 60)
+            # the trees are kept and stay within the budget
+            search.update("red", action)
+            search.search(game, game.result(state, action))
+            self.assertLessEqual(search.nodes, 60)
+            self.assertGreater(search.nodes, 2)
+        finally:
+            search.close()
+
+    def test_workers_follow_the_game(self):
+        players = {colour: RootParallelUCTPlayer(colour, workers=2,
+                                                 iteration=8, max_time=None)
+                   for colour in ("red", "green", "blue")}
+        try:
+            for colour in ("red", "green", "blue", "red"):
+                action = players[colour].action()
+                for player in players.values():
+                    player.update(colour, action)
+            for player in players.values():
+                self.assertEqual(2, len(player.search_algorithm.processes))
+        finally:
+            for player in players.values():
+                player.search_algorithm.close()
@@ -0,0 +1,73 @@
+from unittest import TestCase
+from artificial_idiot.game.game import Game
+from artificial_idiot.game.state import State
+from artificial_idiot.evaluation.evaluator_generator import MinimaxEvaluator
+from artificial_idiot.util.json_parser import JsonParser
+from artificial_idiot.search.mini_max import AlphaBetaSearch
+from artificial_idiot.search.search_cutoff.cutoff import DepthLimitCutoff
+from artificial_idiot.search.transposition import TranspositionTable, \
+    EXACT, LOWER, UPPER
+import json
+
+
+def parse_state(file_name):
+    f = open(file_name)
+    pos_dict, colour, completed = JsonParser(json.load(f)).parse()
+    return State(pos_dict, colour, completed)
+
+
+class TestTranspositionTable(TestCase):
+
+    def test_probe(self):
+        table = TranspositionTable(4)
+        self.assertIsNone(table.probe(1))
+        table.store(1, 2, 10, EXACT, "move")
+        self.assertEqual((1, 2, 10, EXACT, "move"), table.probe(1))
+        self.assertEqual((1, 1, 0), (table.hits, table.misses,
+                                     table.collisions))
+        # same bucket, different position
+        self.assertIsNone(table.probe(5))
+        self.assertEqual(1, table.collisions)
+
+    def test_replacement(self):
+        table = TranspositionTable(4)
+        table.store(1, 3, 10, EXACT, None)
+        # shallower search only goes to the always-replace entry
+        table.store(5, 1, 20, LOWER, None)
+        table.store(9, 2, 30, UPPER, None)
+        self.assertEqual(3, table.probe(1)[1])
+        self.assertIsNone(table.probe(5))
+        self.assertEqual(30, table.probe(9)[2])
+        # deeper search takes over, the old deep entry is kept as recent
+        table.store(13, 4, 40, EXACT, None)
+        self.assertEqual(40, table.probe(13)[2])
+        self.assertEqual(10, table.probe(1)[2])
+        self.assertIsNone(table.probe(9))
+        # the same position is always replaced
+        table.store(13, 1, 50, EXACT, None)
+        self.assertEqual(50, table.probe(13)[2])
+        self.assertEqual(2, len(table))
+
+
+class TestAlphaBetaTransposition(TestCase):
+    weights = [1000, -10, 40, -1000, 10, 0, 1000, 10, 50, -10]
+    evaluator_generator = MinimaxEvaluator(weights)
+
+    def search(self, file_name, make_unmake=False):
+        table = TranspositionTable()
+        search = AlphaBetaSearch(self.evaluator_generator,
+                                 DepthLimitCutoff(4), make_unmake, table)
+        state = parse_state(f"../../tests/{file_name}.json")
+        game = Game('red', state)
+        # a second search starts from a full table
+        return search.search(game, state), search.search(game, state)
+
+    def test_must_exit(self):
+        for make_unmake in (False, True):
+            for action in self.search("must_exit_0", make_unmake):
+                self.assertEqual('EXIT', action[-1])
+
+    def test_eat_green(self):
+        for make_unmake in (False, True):
+            for action in self.search("eat_green", make_unmake):
+                self.assertTupleEqual(((0, 0), (2, -2), 'JUMP'), action)
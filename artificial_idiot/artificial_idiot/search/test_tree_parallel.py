@@ -0,0 +1,67 @@
+from unittest import TestCase
+from multiprocessing import Lock
+import numpy as np
+from artificial_idiot.game.game import Game
+from artificial_idiot.game.node import BasicUCTNode
+from artificial_idiot.game.state import State
+from artificial_idiot.evaluation.evaluator_generator import WinLossEvaluator
+from artificial_idiot.util.json_parser import JsonParser
+from artificial_idiot.search.tree_parallel import TreeParallelUCTSearch, \
+    tree_arrays, tree_size
+import json
+
+
+def parse_state(file_name):
+    f = open(file_name)
+    pos_dict, colour, completed = JsonParser(json.load(f)).parse()
+    return State(pos_dict, colour, completed)
+
+
+def failing_evaluator(state, player):
+    raise ValueError("no evaluation")
+
+
+class TestTreeParallelUCTSearch(TestCase):
+
+    def test_search(self):
+        state = parse_state("../../tests/must_exit_1.json")
+        game = Game("red", state)
+        search = TreeParallelUCTSearch(workers=2, iteration=20,
+                                       max_time=None)
+        action = search.search(game, state)
+        self.assertIn(action, game.actions(state))
+        self.assertEqual(40, search.playouts)
+        self.assertGreater(search.nodes, len(game.actions(state)))
+
+    def test_virtual_loss_removed(self):
+        state = parse_state("../../tests/must_exit_1.json")
+        game = Game("red", state)
+        capacity = 1000
+        tree = tree_arrays(bytearray(tree_size(capacity)), capacity)
+        tree["visits"][0] = 0
+        tree["n_children"][0] = -1
+        tree["size"][0] = 1
+        TreeParallelUCTSearch.playouts(tree, Lock(), game, state,
+                                       BasicUCTNode, WinLossEvaluator(),
+                                       virtual_loss=3, iteration=30)
+        n_children = tree["n_children"][0]
+        first = tree["first_child"][0]
+        self.assertEqual(30, tree["visits"][0])
+        self.assertEqual(30, np.sum(tree["visits"][first:first + n_children]))
+        self.assertTrue(np.all(tree["visits"][:tree["size"][0]] ==
+                               np.round(tree["visits"][:tree["size"][0]])))
+
+    def test_root_not_expanded(self):
+        state = parse_state("../../tests/must_exit_1.json")
+        game = Game("red", state)
+        search = TreeParallelUCTSearch(workers=2, iteration=0, max_time=None)
+        self.assertIn(search.search(game, state), game.actions(state))
+        self.assertEqual(0, search.playouts)
+
+    def test_worker_failed(self):
+        state = parse_state("../../tests/must_exit_1.json")
+        game = Game("red", state)
+        search = TreeParallelUCTSearch(workers=2, iteration=5, max_time=None,
+                                       evaluator=failing_evaluator)
+        with self.assertRaises(RuntimeError):
+            search.search(game, state)
@@ -0,0 +1,172 @@
+from unittest import TestCase
+from unittest.mock import patch
+from artificial_idiot.game.game import NodeGame
+from artificial_idiot.game.node import BasicUCTNode, RAVEUCTNode, \
+    VectorUCTNode
+from artificial_idiot.game.state import State
+from artificial_idiot.util.json_parser import JsonParser
+from artificial_idiot.search.uct import UCTSearch
+from artificial_idiot.game.batch_rollout import BatchRollout
+from artificial_idiot.game.bitboard import EpsilonGreedyPolicy
+from artificial_idiot.evaluation.evaluator_generator import MinimaxEvaluator
+from artificial_idiot.player import BasicUCTPlayer
+import json
+
+
+def parse_state(file_name):
+    f = open(file_name)
+    pos_dict, colour, completed = JsonParser(json.load(f)).parse()
+    return State(pos_dict, colour, completed)
+
+
+def node_game(file_name):
+    state = parse_state(f"../../tests/{file_name}.json")
+    return NodeGame("red", BasicUCTNode(state))
+
+
+class TestUCTSearch(TestCase):
+
+    def test_iteration_budget(self):
+        game = node_game("must_exit_1")
+        search = UCTSearch(iteration=40, early_stopping=False)
+        search.search(game, game.initial_state)
+        self.assertEqual(40, search.playouts)
+        self.assertEqual(40, game.initial_state.visits)
+
+    def test_lazy_expansion(self):
+        # a child is only created for each tried action
+        game = node_game("busy")
+        search = UCTSearch(iteration=10, early_stopping=False)
+        search.search(game, game.initial_state)
+        root = game.initial_state
+        self.assertEqual(10, len(root.children))
+        self.assertEqual(len(game.actions(root.state)),
+                         len(root.children) + len(root.untried_actions))
+        self.assertTrue(all(child.visits == 1
+                            for child in root.children.values()))
+
+    def test_node_budget(self):
+        game = node_game("red_initial_state")
+        search = UCTSearch(iteration=300, early_stopping=False,
+                           rollout_depth=4, node_budget=100, prune_to=0.5)
+        search.search(game, game.initial_state)
+        self.assertEqual(300, game.initial_state.visits)
+        self.assertLessEqual(search.nodes, 100)
+        self.assertEqual(search.nodes,
+                         len(search.tree_nodes(game.initial_state)))
+
+    def test_tree_reuse(self):
+        game = node_game("red_initial_state")
+        search = UCTSearch(iteration=100, early_stopping=False,
+                           rollout_depth=4)
+        action = search.search(game, game.initial_state)
+        old_root = game.initial_state
+        child = old_root.children[action]
+        visits = child.visits
+        game.update("red", action)
+        self.assertIs(child, game.initial_state)
+        self.assertIsNone(child.parent)
+        self.assertEqual({}, old_root.children)
+        search.search(game, game.initial_state)
+        self.assertEqual(visits + 100, game.initial_state.visits)
+        with self.assertRaises(ValueError):
+            game.update("green", (None, None, "EXIT"))
+
+    def test_rave(self):
+        state = parse_state("../../tests/red_initial_state.json")
+        game = NodeGame("red", RAVEUCTNode(state))
+        search = UCTSearch(node_type=RAVEUCTNode, iteration=200,
+                           early_stopping=False, rollout_depth=12)
+        search.search(game, game.initial_state)
+        root = game.initial_state
+        self.assertEqual(set(game.actions(state)), set(root.amaf_stats))
+        # the AMAF statistics count the playouts of the children and the
+        # ones where the action was played later
+        for action, child in root.children.items():
+            wins, visits = root.amaf_stats[action]
+            self.assertGreaterEqual(visits, child.visits)
+            self.assertGreaterEqual(wins, child.wins)
+        self.assertGreater(sum(visits for _, visits
+                               in root.amaf_stats.values()), 200)
+        self.assertTrue(all(len(stats) == 2 and stats[1] <= 200
+                            for stats in root.amaf_stats.values()))
+
+    def test_vector_reward(self):
+        # green exits and wins unless red captures its last piece
+        state = parse_state("../../tests/must_capture_green.json")
+        game = NodeGame("red", VectorUCTNode(state))
+        search = UCTSearch(node_type=VectorUCTNode, iteration=2000,
+                           early_stopping=False, rollout_depth=6)
+        action = search.search(game, game.initial_state)
+        self.assertEqual(((0, 3), (-2, 3), "JUMP"), action)
+        # green picks its own best move, not red's
+        child = game.initial_state.children[((-2, 1), (-2, 2), "MOVE")]
+        best = max(child.children.values(), key=lambda node: node.visits)
+        self.assertEqual("EXIT", best.action[-1])
+        self.assertEqual(child.rewards[0], child.wins)
+        self.assertGreater(child.rewards[1], child.rewards[0])
+
+    def test_batch_rollout(self):
+        game = node_game("must_exit_1")
+        search = UCTSearch(iteration=64, early_stopping=False,
+                           batch_rollout=BatchRollout(16))
+        search.search(game, game.initial_state)
+        self.assertEqual(64, search.playouts)
+        self.assertEqual(64, game.initial_state.visits)
+        # one expanded leaf for each batch of 16
+        self.assertEqual(4, sum(child.visits > 0 for child
+                                in game.initial_state.children.values()))
+
+    def test_playout_policy(self):
+        calls = []
+
+        class CountingPolicy(EpsilonGreedyPolicy):
+            def __call__(self, *moves):
+                calls.append(moves)
+                return super().__call__(*moves)
+
+        game = node_game("exit")
+        search = UCTSearch(iteration=40, early_stopping=False,
+                           playout_policy=CountingPolicy(0))
+        search.search(game, game.initial_state)
+        self.assertEqual(40, search.playouts)
+        self.assertTrue(calls)
+
+    def test_truncated_rollout(self):
+        weights = [1000, -10, 40, -1000, 10, 0, 1000, 10, 50, -10]
+        game = node_game("red_initial_state")
+        search = UCTSearch(iteration=30, early_stopping=False,
+                           rollout_depth=6,
+                           cutoff_evaluator=MinimaxEvaluator(weights))
+        state = game.initial_state.state
+        self.assertEqual(0.5, search.playout_value(game, state, True))
+        value = search.playout_value(game, state, False)
+        self.assertTrue(0 < value < 1)
+        search.search(game, game.initial_state)
+        wins = game.initial_state.wins
+        self.assertTrue(0 < wins < 30)
+        self.assertNotEqual(int(wins), wins)
+
+    def test_time_budget(self):
+        game = node_game("must_exit_1")
+        search = UCTSearch(iteration=None, max_time=0.35,
+                           early_stopping=False)
+        # a clock on which every playout takes 0.1 s
+        with patch("artificial_idiot.search.uct.process_time",
+                   lambda: search.playouts * 0.1):
+            search.search(game, game.initial_state)
+        # stops at the last playout that fits in the budget
+        self.assertEqual(search.playouts, 3)
+
+    def test_early_stopping(self):
+        # red can only pass, that child can never be overtaken
+        game = node_game("only_one_move")
+        search = UCTSearch(iteration=100)
+        action = search.search(game, game.initial_state)
+        self.assertEqual("PASS", action[-1])
+        self.assertLess(search.playouts, 100)
+
+    def test_player(self):
+        player = BasicUCTPlayer("green", iteration=None, max_time=0.2)
+        action = player.action()
+        self.assertIn(action[0], ("MOVE", "JUMP"))
@@ -0,0 +1,91 @@
+"""
+Transposition table for the alpha beta searches.
+
+Pieces in Chexers move independently of each other, so the same position is
+reached through many different move orders. The table remembers the result of
+every searched position so that a transposition is either cut off right away
+or at least searched with its best move first.
+"""
+
+# Meaning of a stored value with respect to the true value of the position
+EXACT = 0
+# true value >= stored value (the search failed high)
+LOWER = 1
+# true value <= stored value (the search failed low)
+UPPER = 2
+
+
+class TranspositionTable:
+    """
+    Fixed capacity hash table with two entries per bucket:
+    a depth-preferred entry that is only replaced by a search at least as deep
+    and an always-replace entry that holds the most recent other position.
+    An entry is the tuple (key, depth, value, flag, best move).
+    """
+
+    def __init__(self, capacity=2 ** 16):
+        """
+        :param capacity: number of buckets, the table holds at most twice as
+            many positions
+        """
+        self.capacity = capacity
+        self.deep = [None] * capacity
+        self.recent = [None] * capacity
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def probe(self, key):
+        """
+        Find the entry of a position
+        :param key: hash of the position
+        :return: the entry, or None when the position is not stored
+        """
+        index = key % self.capacity
+        for entry in (self.deep[index], self.recent[index]):
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry
+        self.misses += 1
+        # the bucket is in use by other positions
+        if self.deep[index] is not None:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, value, flag, best_move):
+        """
+        Remember the result of a search
+        :param key: hash of the position
+        :param depth: remaining depth the position was searched to
+        :param value: value found by the search
+        :param flag: one of EXACT, LOWER, UPPER
+        :param best_move: the best action found, None if there is none
+        """
+        index = key % self.capacity
+        entry = (key, depth, value, flag, best_move)
+        deep = self.deep[index]
+        if deep is None or deep[0] == key or depth >= deep[1]:
+            # keep the entry that is pushed out as the recent one
+            if deep is not None and deep[0] != key:
+                self.recent[index] = deep
+            elif self.recent[index] is not None \
+                    and self.recent[index][0] == key:
+                self.recent[index] = None
+            self.deep[index] = entry
+        else:
+            self.recent[index] = entry
+
+    def clear(self):
+        self.deep = [None] * self.capacity
+        self.recent = [None] * self.capacity
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def __len__(self):
+        return sum(entry is not None for entry in self.deep) + \
+            sum(entry is not None for entry in self.recent)
+
+    def __str__(self):
+        return f'hits: {self.hits}, misses: {self.misses}, ' \
+            f'collisions: {self.collisions}, size: {len(self)}'
@@ -0,0 +1,224 @@
+from multiprocessing import Lock, Process
+from multiprocessing.shared_memory import SharedMemory
+from time import process_time
+import os
+import random
+import numpy as np
+from artificial_idiot.search.search import Search
+from artificial_idiot.game.node import BasicUCTNode
+from artificial_idiot.game.bitboard import random_playout
+from artificial_idiot.evaluation.evaluator_generator import WinLossEvaluator
+
+# arrays of the shared tree, node 0 is the root
+FIELDS = (("visits", np.float64), ("wins", np.float64),
+          ("first_child", np.int32), ("n_children", np.int32))
+
+
+def tree_arrays(buffer, capacity):
+    """
+    Views of the tree arrays and of the node counter on a shared buffer
+    """
+    arrays = {}
+    offset = 0
+    for name, dtype in FIELDS:
+        arrays[name] = np.ndarray((capacity,), dtype, buffer, offset)
+        offset += capacity * np.dtype(dtype).itemsize
+    arrays["size"] = np.ndarray((1,), np.int64, buffer, offset)
+    return arrays
+
+
+def tree_size(capacity):
+    """
+    Bytes needed by tree_arrays
+    """
+    return sum(capacity * np.dtype(dtype).itemsize
+               for _, dtype in FIELDS) + np.dtype(np.int64).itemsize
+
+
+def rollout_worker(name, capacity, lock, game, state, node_type, evaluator,
+                   virtual_loss, iteration, max_time):
+    """
+    Run playouts on the shared tree until the iteration or time budget is
+    used up
+    """
+    random.seed()
+    memory = SharedMemory(name)
+    tree = tree_arrays(memory.buf, capacity)
+    try:
+        TreeParallelUCTSearch.playouts(tree, lock, game, state, node_type,
+                                       evaluator, virtual_loss, iteration,
+                                       max_time)
+    finally:
+        # the views have to be released before the memory is closed
+        del tree
+        memory.close()
+
+
+class TreeParallelUCTSearch(Search):
+    """
+    Tree parallel UCT. A single tree is stored in shared memory arrays and
+    every worker process descends it, expands it and backs its playouts up
+    into it. A worker adds a virtual loss to the nodes on its path until its
+    playout is backed up, so the other workers are spread over other
+    branches.
+    The children of a node are stored next to each other in the order of
+    game.actions, so the state of a node is found again by playing the
+    actions from the root.
+    """
+
+    def __init__(self, workers=None, c=2, node_type=BasicUCTNode,
+                 evaluator=None, iteration=None, max_time=1,
+                 virtual_loss=1, capacity=2 ** 18):
+        """
+        :param workers: number of worker processes, one per core by default
+        :param c: exploration constant of UCB
+        :param node_type: node class whose ucb is used to select children
+        :param evaluator: (state, player) -> result of a playout, a win is 1
+        :param iteration: number of playouts of each worker per search
+        :param max_time: CPU seconds of each worker per search
+        :param virtual_loss: lost visits added to the nodes on the path of a
+            worker until its playout is backed up
+        :param capacity: maximum number of nodes of the tree
+        """
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.c = c
+        self.node_type = node_type
+        self.node_type.set_c(c)
+        self.evaluator = evaluator if evaluator is not None \
+            else WinLossEvaluator()
+        self.iteration = iteration
+        self.max_time = max_time
+        self.virtual_loss = virtual_loss
+        self.capacity = capacity
+        # size of the tree and visits of the root after the last search
+        self.nodes = 0
+        self.playouts = 0
+
+    @staticmethod
+    def expand(tree, lock, node, n_children):
+        """
+        Allocate the children of a node, unless another worker did it first
+        or the tree is full
+        :return: whether the node has children
+        """
+        with lock:
+            if tree["n_children"][node] < 0:
+                first = int(tree["size"][0])
+                if first + n_children > len(tree["visits"]):
+                    return False
+                last = first + n_children
+                tree["visits"][first:last] = 0
+                tree["wins"][first:last] = 0
+                tree["n_children"][first:last] = -1
+                tree["first_child"][node] = first
+                tree["n_children"][node] = n_children
+                tree["size"][0] = last
+        return True
+
+    @staticmethod
+    def select(tree, node, node_type):
+        """
+        :return: index in the children of the child with the best ucb, an
+            unvisited child first
+        """
+        first = tree["first_child"][node]
+        last = first + tree["n_children"][node]
+        visits = tree["visits"][first:last]
+        unvisited = np.flatnonzero(visits == 0)
+        if len(unvisited):
+            return int(random.choice(unvisited))
+        wins = tree["wins"][first:last]
+        parent_visits = tree["visits"][node]
+        values = [node_type.ucb(wins[i], visits[i], parent_visits)
+                  for i in range(len(visits))]
+        return values.index(max(values))
+
+    @classmethod
+    def playouts(cls, tree, lock, game, state, node_type, evaluator,
+                 virtual_loss, iteration=None, max_time=None):
+        """
+        Playouts of a worker on the shared tree
+        :return: number of playouts
+        """
+        start = process_time()
+        count = 0
+        while (iteration is None or count < iteration) and \
+                (max_time is None or process_time() - start < max_time):
+            node = 0
+            node_state = state
+            path = [0]
+            with lock:
+                tree["visits"][0] += virtual_loss
+            # Selection and expansion, stop after the first unvisited node
+            while not game.terminal_state(node_state):
+                actions = game.actions(node_state)
+                if tree["n_children"][node] < 0 and \
+                        not cls.expand(tree, lock, node, len(actions)):
+                    break
+                index = cls.select(tree, node, node_type)
+                node = tree["first_child"][node] + index
+                node_state = game.result(node_state, actions[index])
+                path.append(node)
+                with lock:
+                    visited = tree["visits"][node] != 0
+                    tree["visits"][node] += virtual_loss
+                if not visited:
+                    break
+            final_state, _ = random_playout(node_state)
+            win = evaluator(final_state, "red") == 1
+            # Back propagation, the virtual loss becomes the real visit
+            with lock:
+                for node in path:
+                    tree["visits"][node] += 1 - virtual_loss
+                    tree["wins"][node] += win
+            count += 1
+        return count
+
+    def search(self, game, state, iteration=None, max_time=None, **kwargs):
+        """
+        :return: action of the most visited child of the root, a random
+            action if the root was never expanded
+        :raise RuntimeError: when a worker failed
+        """
+        if iteration is None:
+            iteration = self.iteration
+        if max_time is None:
+            max_time = self.max_time
+        memory = SharedMemory(create=True, size=tree_size(self.capacity))
+        try:
+            tree = tree_arrays(memory.buf, self.capacity)
+            tree["visits"][0] = 0
+            tree["wins"][0] = 0
+            tree["n_children"][0] = -1
+            tree["size"][0] = 1
+            lock = Lock()
+            processes = [Process(target=rollout_worker,
+                                 args=(memory.name, self.capacity, lock, game,
+                                       state, self.node_type, self.evaluator,
+                                       self.virtual_loss, iteration,
+                                       max_time))
+                         for _ in range(self.workers)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            failed = [process.exitcode for process in processes
+                      if process.exitcode != 0]
+            if failed:
+                raise RuntimeError(f"UCT workers exited with {failed}")
+            self.nodes = int(tree["size"][0])
+            self.playouts = int(tree["visits"][0])
+            actions = game.actions(state)
+            # No worker got to the root, e.g. with a tiny time budget
+            if tree["n_children"][0] < 0:
+                action = random.choice(actions)
+            else:
+                first = tree["first_child"][0]
+                visits = tree["visits"][first:first + len(actions)]
+                action = actions[int(np.argmax(visits))]
+                del visits
+            del tree
+        finally:
+            memory.close()
+            memory.unlink()
+        return action
@@ -1,13 +1,79 @@
+from math import exp
+from time import process_time
 from artificial_idiot.search.search import Search
-from artificial_idiot.game.node import BasicUCTNode
+from artificial_idiot.game.node import Node, BasicUCTNode
+from artificial_idiot.game.state import CODE_MAP, REV_CODE_MAP
+from artificial_idiot.game.bitboard import random_playout, BIT_ACTIONS
+from artificial_idiot.evaluation.evaluator_generator import WinLossEvaluator
 
 
 class UCTSearch(Search):
-    def __init__(self, c=2, node_type=BasicUCTNode):
+    def __init__(self, c=2, node_type=BasicUCTNode, evaluator=None,
+                 iteration=10, max_time=None, check_every=16,
+                 early_stopping=True, light_rollout=True,
+                 batch_rollout=None, rollout_depth=-1, cutoff_evaluator=None,
+                 cutoff_scale=100, repetitions=4, draw_value=0.5,
+                 playout_policy=None, node_budget=None, prune_to=0.75):
+        """
+        :param c: exploration constant of UCB
+        :param node_type: node class of the tree
+        :param evaluator: (state, player) -> result of a finished playout,
+            a win is 1
+        :param iteration: number of playouts per search, None for as many as
+            the time allows
+        :param max_time: CPU seconds per search, None for no time limit
+        :param check_every: maximum number of playouts between two reads of
+            the clock, fewer when the time left is shorter
+        :param early_stopping: stop once the most visited child of the root
+            can no longer be overtaken with the remaining budget
+        :param light_rollout: play the playouts on a bitboard instead of
+            with the default policy of the nodes, which adds every state of
+            the playout to the tree
+        :param batch_rollout: BatchRollout to play a batch of playouts from
+            every expanded leaf in one call, None for one playout
+        :param rollout_depth: maximum number of moves of a playout, -1 to
+            play until the end of the game
+        :param cutoff_evaluator: evaluator generator that values a playout
+            cut short by rollout_depth, squashed to [0, 1] by a logistic
+            function. None values it as a draw
+        :param cutoff_scale: the evaluation is divided by it before squashing,
+            so this evaluation is worth about 0.73
+        :param repetitions: a playout that sees a position this many times
+            is a draw, None to never check
+        :param draw_value: result of a drawn playout
+        :param playout_policy: policy of the bitboard playouts, such as
+            EpsilonGreedyPolicy, uniformly random moves by default
+        :param node_budget: maximum number of nodes of the tree, which is
+            kept between turns. None for no limit
+        :param prune_to: once the budget is reached, the least visited leaves
+            are pruned until the tree is this fraction of it
+        """
         self.c = c
         self.node_type = node_type
         self.node_type.set_c(c)
+        self.evaluator = evaluator if evaluator is not None \
+            else WinLossEvaluator()
+        self.iteration = iteration
+        self.max_time = max_time
+        self.check_every = check_every
+        self.early_stopping = early_stopping
+        self.light_rollout = light_rollout
+        self.batch_rollout = batch_rollout
+        self.rollout_depth = rollout_depth
+        self.cutoff_evaluator = cutoff_evaluator
+        self.cutoff_scale = cutoff_scale
+        self.repetitions = repetitions
+        self.draw_value = draw_value
+        self.playout_policy = playout_policy
+        self.node_budget = node_budget
+        self.prune_to = prune_to
         self.initial_node = None
+        # (colour code, from bit, to bit) of the moves of the last playout,
+        # recorded for nodes with AMAF statistics
+        self.played = []
+        # playouts and tree size of the last search
+        self.playouts = 0
+        self.nodes = 0
 
     def select_expand(self, game):
         """
@@ -19,8 +85,8 @@ class UCTSearch(Search):
         node = game.initial_state
 
         # Fully expanded and not leaf
-        while node.unexpanded_children is not None and \
-                len(node.unexpanded_children) == 0 and node is not None:
+        while node is not None and node.untried_actions is not None \
+                and len(node.untried_actions) == 0:
             parent = node
             node = node.tree_policy(game)
         # Found a leaf of the whole tree
@@ -32,35 +98,182 @@ class UCTSearch(Search):
             node = node.tree_policy(game)
             return node if node is not None else parent
 
-    def simulation(self, game, node):
-        while not game.terminal_state(node.state):
+    def simulation(self, game, node, max_depth=-1):
+        """
+        Play the default policy from a node
+        :param max_depth: maximum number of moves of the playout, -1 to play
+            until the end of the game
+        :return: (state where the playout stopped, whether it stopped on a
+            repeated position) of every playout
+        """
+        self.played = []
+        if self.batch_rollout is not None:
+            return [(state, False) for state in self.batch_rollout.run(
+                node.state, None if max_depth == -1 else max_depth)]
+        if self.light_rollout:
+            return [random_playout(node.state, max_depth, self.repetitions,
+                                   self.playout_policy,
+                                   self.played if self.node_type.amaf
+                                   else None)]
+        depth = 0
+        while not game.terminal_state(node.state) and depth != max_depth:
             node = node.default_policy(game)
-        return node
+            depth += 1
+        return [(node.state, False)]
+
+    def playout_value(self, game, state, repeated, colour="red"):
+        """
+        Result of a playout for a colour: the evaluator at the end of the
+        game, a draw on a repeated position, and the squashed cutoff
+        evaluation when it was cut short
+        """
+        if game.terminal_state(state):
+            return self.evaluator(state, colour)
+        if repeated or self.cutoff_evaluator is None:
+            return self.draw_value
+        value = self.cutoff_evaluator(state)(colour) / self.cutoff_scale
+        # exp overflows far from 0
+        return 1 / (1 + exp(-min(max(value, -500), 500)))
+
+    def played_actions(self):
+        """
+        :return: set of (colour, action) of the moves of the last playout
+        """
+        return {(REV_CODE_MAP[code], BIT_ACTIONS[fr, to])
+                for code, fr, to in self.played}
 
     def back_prop(self, game, leaf, result, *args, **kwargs):
         node = leaf
-        # Back prop till the root node (but not include that)
+        # Back prop till the root node (including it, its ancestors are
+        # previous turns)
         while node is not None:
             node.update(result, *args, **kwargs)
-            # Some how got to a node without parent but is not root
+            if node is game.initial_state:
+                break
             node = node.parent
 
-    def search(self, game, state, iteration=10, max_depth=-1,
-               max_time=-1, training=True):
-        # TODO add depth, time and cutoff
-        # TODO fix this iteration
-        while iteration > 0:
+    @staticmethod
+    def tree_nodes(root):
+        """
+        :return: every node of the tree, the root first
+        """
+        nodes = [root]
+        for node in nodes:
+            nodes.extend(node.children.values())
+        return nodes
+
+    def prune(self, root, target):
+        """
+        Remove the least visited leaves until the tree has target nodes.
+        Their actions are tried again when their parent is expanded
+        """
+        while self.nodes > target:
+            leaves = [node for node in self.tree_nodes(root)
+                      if not node.children and node is not root]
+            if not leaves:
+                break
+            leaves.sort(key=lambda node: node.visits)
+            for leaf in leaves[:self.nodes - target]:
+                parent = leaf.parent
+                del parent.children[leaf.action]
+                if parent.untried_actions is not None:
+                    parent.untried_actions.append(leaf.action)
+                leaf.parent = None
+                self.nodes -= 1
+
+    @staticmethod
+    def most_visited(root):
+        """
+        :return: visits of the most visited and the second most visited
+            children, and the most visited child
+        """
+        first = second = 0
+        best = None
+        for child in root.children.values():
+            if child.visits > first:
+                first, second, best = child.visits, first, child
+            elif child.visits > second:
+                second = child.visits
+        return first, second, best
+
+    def search(self, game, state, iteration=None, max_depth=None,
+               max_time=None, training=True):
+        """
+        Run playouts until the iteration or time budget is used up, or until
+        the most visited child of the root is certain to stay the most
+        visited.
+        :param iteration: playout budget, defaults to the one of the search
+        :param max_depth: maximum number of moves of a playout, defaults to
+            the rollout depth of the search
+        :param max_time: CPU seconds budget, defaults to the one of the search
+        :return: action of the most visited child of the root
+        """
+        if iteration is None:
+            iteration = self.iteration
+        if max_time is None:
+            max_time = self.max_time
+        if max_depth is None:
+            max_depth = self.rollout_depth
+        if iteration is None and max_time is None:
+            raise ValueError("UCT search needs an iteration or time budget")
+        root = game.initial_state
+        start = process_time()
+        self.playouts = 0
+        # the tree of the previous turns is kept
+        self.nodes = len(self.tree_nodes(root))
+        created = Node.total_nodes_created
+        # the clock is first read after one playout, then at intervals that
+        # double up to check_every as the rate of the playouts is measured
+        interval = 1
+        next_check = 1
+        while iteration is None or self.playouts < iteration:
             # Get a leaf
             expanded = self.select_expand(game)
-            # print("==================== before ====================")
-            # expanded.show_path()
-            leaf = self.simulation(game, expanded)
-            result = game.evaluator(leaf.state, "red")
-            # print(f"---------- {result} ----------")
-            self.back_prop(game, expanded, result=game.evaluator(
-                leaf.state, "red"))
-            iteration -= 1
-            # print("-------------------- after --------------------")
-            # expanded.show_path()
-        return game.initial_state.tree_policy(game).action
+            for final_state, repeated in self.simulation(game, expanded,
+                                                         max_depth):
+                if self.node_type.vector:
+                    result = tuple(self.playout_value(game, final_state,
+                                                      repeated, colour)
+                                   for colour in CODE_MAP)
+                else:
+                    result = self.playout_value(game, final_state, repeated)
+                if self.node_type.amaf:
+                    self.back_prop(game, expanded, result=result,
+                                   played=self.played_actions())
+                else:
+                    self.back_prop(game, expanded, result=result)
+                self.playouts += 1
+            self.nodes += Node.total_nodes_created - created
+            created = Node.total_nodes_created
+            if self.node_budget is not None and self.nodes > self.node_budget:
+                self.prune(root, int(self.node_budget * self.prune_to))
 
+            if self.playouts < next_check:
+                continue
+            interval = min(2 * interval, self.check_every)
+            next_check = self.playouts + interval
+            # playouts left in the budget
+            remaining = None
+            if iteration is not None:
+                remaining = iteration - self.playouts
+            if max_time is not None:
+                elapsed = process_time() - start
+                # playouts that fit in the remaining time at the current rate
+                affordable = (max_time - elapsed) * self.playouts / elapsed \
+                    if elapsed > 0 else 1
+                # the next playout would go over the time
+                if affordable < 1:
+                    break
+                # read the clock again before half of the time left is used
+                next_check = self.playouts + \
+                    max(1, min(interval, int(affordable / 2)))
+                remaining = affordable if remaining is None \
+                    else min(remaining, affordable)
+            if self.early_stopping and remaining is not None:
+                first, second, _ = self.most_visited(root)
+                if first - second > remaining:
+                    break
+        _, _, best = self.most_visited(root)
+        if best is None:
+            return root.tree_policy(game).action
+        return best.action
@@ -0,0 +1,69 @@
+"""
+Count the nodes searched and states evaluated by AlphaBetaSearch with
+different options on every position in tests/*.json.
+
+Run from the artificial_idiot directory:
+    python -m benchmarking.alpha_beta [depth ...]
+"""
+import random
+import sys
+from math import inf
+from time import process_time
+
+from artificial_idiot.evaluation.evaluator_generator import MinimaxEvaluator
+from artificial_idiot.game.game import Game
+from artificial_idiot.search.mini_max import AlphaBetaSearch
+from artificial_idiot.search.search_cutoff.cutoff import DepthLimitCutoff
+from benchmarking.move_generation import load_states
+from benchmarking.transposition import WEIGHTS
+
+# name -> keyword arguments of AlphaBetaSearch
+CONFIGURATIONS = {
+    "static ordering": {},
+    "dynamic ordering": {"dynamic_ordering": True},
+    "pvs": {"dynamic_ordering": True, "principal_variation_search": True},
+    "iterative": {"dynamic_ordering": True, "time_budget": inf},
+    "iterative pvs": {"dynamic_ordering": True, "time_budget": inf,
+                      "principal_variation_search": True},
+    "iterative aspiration": {"dynamic_ordering": True, "time_budget": inf,
+                             "principal_variation_search": True,
+                             "aspiration_window": 500},
+    "quiescence, depth - 2": {"dynamic_ordering": True,
+                              "quiescence_depth": 4, "depth": -2},
+    "reductions, depth - 2": {"dynamic_ordering": True,
+                              "quiescence_depth": 4, "depth": -2,
+                              "late_move_reduction": 16,
+                              "futility_margin": 300},
+}
+
+
+def benchmark(states, depth, **kwargs):
+    """
+    :param depth: max depth, a depth in kwargs is added to it
+    :return: the search, to read its statistics from, and the CPU time of
+        searching every state
+    """
+    depth += kwargs.pop("depth", 0)
+    search = AlphaBetaSearch(MinimaxEvaluator(WEIGHTS),
+                             DepthLimitCutoff(depth), **kwargs)
+    random.seed(0)
+    start = process_time()
+    for state in states:
+        search.search(Game("red", state), state)
+    return search, process_time() - start
+
+
+if __name__ == '__main__':
+    depths = [int(depth) for depth in sys.argv[1:]] or [4, 6]
+    states = load_states()
+    for depth in depths:
+        print(f"depth {depth}:")
+        for name, kwargs in CONFIGURATIONS.items():
+            search, elapsed = benchmark(states, depth, **kwargs)
+            print(f"{name:>20}: {search.nodes:>7} nodes, "
+                  f"{search.evaluations:>7} evaluations, "
+                  f"{search.researches:>5} re-searches, "
+                  f"{search.aspiration_failures:>3} aspiration failures, "
+                  f"{search.reductions:>5} reductions, "
+                  f"{search.futility_prunes:>5} futility prunes, "
+                  f"{elapsed:.2f}s")
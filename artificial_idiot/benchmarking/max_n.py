@@ -0,0 +1,52 @@
+"""
+Count the nodes searched by MaxN without pruning, with shallow pruning and
+with speculative pruning on every position in tests/*.json.
+
+Run from the artificial_idiot directory:
+    python -m benchmarking.max_n [depth ...]
+"""
+import sys
+from time import process_time
+
+from artificial_idiot.evaluation.evaluator_generator import (
+    NaiveEvaluatorGenerator, ConstantSumEvaluatorGenerator
+)
+from artificial_idiot.game.game import Game
+from artificial_idiot.search.max_n import MaxN
+from artificial_idiot.search.search_cutoff.cutoff import DepthLimitCutoff
+from benchmarking.move_generation import load_states
+
+# name -> keyword arguments of MaxN
+CONFIGURATIONS = {
+    "no pruning": {},
+    "shallow": {"max_sum": 1},
+    "speculative": {"max_sum": 1, "speculative": True},
+}
+
+
+def benchmark(states, depth, **kwargs):
+    """
+    :return: the search, the actions chosen and the CPU time used
+    """
+    evaluator = ConstantSumEvaluatorGenerator(
+        NaiveEvaluatorGenerator([10, 100, 1]))
+    search = MaxN(evaluator, DepthLimitCutoff(depth), 3, **kwargs)
+    start = process_time()
+    actions = [search.search(Game("red", state), state) for state in states]
+    return search, actions, process_time() - start
+
+
+if __name__ == '__main__':
+    depths = [int(depth) for depth in sys.argv[1:]] or [3, 4]
+    states = load_states()
+    for depth in depths:
+        print(f"depth {depth}:")
+        full_actions = None
+        for name, kwargs in CONFIGURATIONS.items():
+            search, actions, elapsed = benchmark(states, depth, **kwargs)
+            if full_actions is None:
+                full_actions = actions
+            same = sum(a == b for a, b in zip(actions, full_actions))
+            print(f"{name:>12}: {search.nodes:>8} nodes, "
+                  f"{search.researches:>5} re-searches, {elapsed:.2f}s, "
+                  f"{same}/{len(states)} same actions")
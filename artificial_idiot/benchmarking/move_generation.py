@@ -0,0 +1,75 @@
+"""
+Compare the speed of move generation between the dictionary based Game and
+the BitboardGame on every position in tests/*.json.
+
+Run from the artificial_idiot directory:
+    python -m benchmarking.move_generation [depth]
+"""
+import glob
+import json
+import sys
+from time import perf_counter
+
+from artificial_idiot.game.game import Game
+from artificial_idiot.game.state import State
+from artificial_idiot.game.bitboard import BitboardGame
+from artificial_idiot.util.json_parser import JsonParser
+
+
+def load_states(pattern="tests/*.json"):
+    states = []
+    for file_name in sorted(glob.glob(pattern)):
+        with open(file_name) as f:
+            try:
+                pos_dict, colour, completed = JsonParser(json.load(f)).parse()
+            except (ValueError, KeyError):
+                continue
+        states.append(State(dict(pos_dict), colour, completed))
+    return states
+
+
+def perft(game, state, depth):
+    """
+    Count the number of positions generated by expanding every action
+    through actions and result
+    """
+    if depth == 0:
+        return 0
+    generated = 0
+    for action in game.actions(state):
+        generated += 1 + perft(game, game.result(state, action), depth - 1)
+    return generated
+
+
+def perft_successors(game, state, depth):
+    """
+    Same as perft but the children are generated all at once by successors
+    """
+    if depth == 0:
+        return 0
+    generated = 0
+    for action, child in game.successors(state):
+        generated += 1 + perft_successors(game, child, depth - 1)
+    return generated
+
+
+def benchmark(game_type, states, depth, count):
+    games = [game_type("red", state) for state in states]
+    game_type.actions.cache_clear()
+    start = perf_counter()
+    generated = sum(count(game, game.initial_state, depth) for game in games)
+    return generated, perf_counter() - start
+
+
+if __name__ == '__main__':
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    states = load_states()
+    for count in (perft, perft_successors):
+        print(f"{count.__name__}, depth {depth}:")
+        rates = {}
+        for game_type in (Game, BitboardGame):
+            generated, elapsed = benchmark(game_type, states, depth, count)
+            rates[game_type] = generated / elapsed
+            print(f"{game_type.__name__:>14}: {generated} positions in "
+                  f"{elapsed:.3f}s ({rates[game_type]:,.0f} positions/s)")
+        print(f"{'speed up':>14}: {rates[BitboardGame] / rates[Game]:.1f}x")
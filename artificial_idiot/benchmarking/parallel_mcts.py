@@ -0,0 +1,70 @@
+"""
+Compare root parallel and tree parallel UCT with the same number of workers
+and the same CPU time per worker: playouts per search from the initial
+position, and optionally a match between the two players.
+
+Run from the artificial_idiot directory:
+    python -m benchmarking.parallel_mcts [workers] [seconds] [games per seat]
+"""
+import sys
+from time import time
+
+from artificial_idiot.player import (
+    Player, RootParallelUCTPlayer, TreeParallelUCTPlayer
+)
+from artificial_idiot.search.root_parallel import RootParallelUCTSearch
+from artificial_idiot.search.tree_parallel import TreeParallelUCTSearch
+from benchmarking.self_play import match
+
+
+def benchmark(search_type, searches=3, **kwargs):
+    """
+    A new search from the initial position each time, so that the root
+    parallel trees do not carry visits over
+    :return: playouts, tree nodes (0 for root parallel) and wall time per
+        search
+    """
+    game = Player("red").game
+    state = game.initial_state
+    playouts = nodes = elapsed = 0
+    for _ in range(searches):
+        search = search_type(**kwargs)
+        start = time()
+        search.search(game, state)
+        elapsed += time() - start
+        if isinstance(search, RootParallelUCTSearch):
+            playouts += sum(visits for visits, _
+                            in search.statistics.values())
+            search.close()
+        else:
+            playouts += search.playouts
+            nodes += search.nodes
+    return playouts / searches, nodes / searches, elapsed / searches
+
+
+if __name__ == '__main__':
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 1
+    games = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    for name, search_type in (("root parallel", RootParallelUCTSearch),
+                              ("tree parallel", TreeParallelUCTSearch)):
+        playouts, nodes, elapsed = benchmark(search_type, workers=workers,
+                                             max_time=seconds)
+        print(f"{name}: {playouts:.0f} playouts, {nodes:.0f} tree nodes, "
+              f"{elapsed:.2f}s")
+
+    if games:
+        def tree_player(colour):
+            return TreeParallelUCTPlayer(colour, workers=workers,
+                                         max_time=seconds)
+
+        def root_player(colour):
+            return RootParallelUCTPlayer(colour, workers=workers,
+                                         max_time=seconds)
+        tree_player.__name__ = TreeParallelUCTPlayer.__name__
+        root_player.__name__ = RootParallelUCTPlayer.__name__
+        results, _, _ = match(tree_player, root_player, games)
+        print(f"TreeParallelUCTPlayer against two RootParallelUCTPlayer: "
+              f"{results['win']} wins, {results['draw']} draws, "
+              f"{results['loss']} losses")
@@ -0,0 +1,85 @@
+"""
+Play a player against two copies of another one, in every seat, with the
+referee's rules but without its time and space limits.
+
+Run from the artificial_idiot directory:
+    python -m benchmarking.self_play [games per seat]
+"""
+import random
+import sys
+from collections import Counter, defaultdict
+from time import process_time
+
+from referee.game import Chexers
+from artificial_idiot.player import BestReplyPlayer, ParanoidPlayer_Naive
+
+COLOURS = ("red", "green", "blue")
+
+
+def play(player_types):
+    """
+    Play a game
+    :param player_types: player classes of red, green and blue
+    :return: the colour of the winner (None if draw), the CPU time used
+        and the number of actions of each colour
+    """
+    game = Chexers(None)
+    players = [player_type(colour)
+               for colour, player_type in zip(COLOURS, player_types)]
+    cpu_time = defaultdict(float)
+    turns = Counter()
+    turn = 0
+    while not game.over():
+        colour = COLOURS[turn % 3]
+        start = process_time()
+        action = players[turn % 3].action()
+        cpu_time[colour] += process_time() - start
+        turns[colour] += 1
+        game.update(colour, action)
+        for player in players:
+            player.update(colour, action)
+        turn += 1
+    winner = None
+    for colour in COLOURS:
+        if game.score[colour[0]] >= 4:
+            winner = colour
+    return winner, cpu_time, turns
+
+
+def match(player_type, opponent_type, games):
+    """
+    Seat player_type in every colour against two opponent_type players
+    """
+    results = Counter()
+    cpu_time = defaultdict(float)
+    turns = Counter()
+    for seat in range(3):
+        for game in range(games):
+            random.seed(game)
+            player_types = [opponent_type] * 3
+            player_types[seat] = player_type
+            winner, game_time, game_turns = play(player_types)
+            if winner is None:
+                results["draw"] += 1
+            elif winner == COLOURS[seat]:
+                results["win"] += 1
+            else:
+                results["loss"] += 1
+            for colour in COLOURS:
+                name = player_types[COLOURS.index(colour)].__name__
+                cpu_time[name] += game_time[colour]
+                turns[name] += game_turns[colour]
+            print(f"{player_type.__name__} as {COLOURS[seat]}, game {game}: "
+                  f"winner {winner}", flush=True)
+    return results, cpu_time, turns
+
+
+if __name__ == '__main__':
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    results, cpu_time, turns = match(BestReplyPlayer, ParanoidPlayer_Naive,
+                                     games)
+    print(f"BestReplyPlayer against two ParanoidPlayer_Naive: "
+          f"{results['win']} wins, {results['draw']} draws, "
+          f"{results['loss']} losses")
+    for name in cpu_time:
+        print(f"{name:>21}: {cpu_time[name] / turns[name]:.3f}s per action")
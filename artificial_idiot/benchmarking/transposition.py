@@ -0,0 +1,46 @@
+"""
+Compare AlphaBetaSearch with and without a transposition table on every
+position in tests/*.json.
+
+Run from the artificial_idiot directory:
+    python -m benchmarking.transposition [depth ...]
+"""
+import random
+import sys
+from time import process_time
+
+from artificial_idiot.evaluation.evaluator_generator import MinimaxEvaluator
+from artificial_idiot.game.game import Game
+from artificial_idiot.search.mini_max import AlphaBetaSearch
+from artificial_idiot.search.search_cutoff.cutoff import DepthLimitCutoff
+from artificial_idiot.search.transposition import TranspositionTable
+from benchmarking.move_generation import load_states
+
+WEIGHTS = [1000, -10, 40, -1000, 10, 0, 1000, 10, 50, -10]
+
+
+def benchmark(states, depth, table=None):
+    """
+    Search every state once, the table is shared between the searches like
+    it is between the turns of a game
+    :return: the CPU time used
+    """
+    search = AlphaBetaSearch(MinimaxEvaluator(WEIGHTS),
+                             DepthLimitCutoff(depth),
+                             transposition_table=table)
+    random.seed(0)
+    start = process_time()
+    for state in states:
+        search.search(Game("red", state), state)
+    return process_time() - start
+
+
+if __name__ == '__main__':
+    depths = [int(depth) for depth in sys.argv[1:]] or [4, 5, 6]
+    states = load_states()
+    for depth in depths:
+        elapsed = benchmark(states, depth)
+        print(f"depth {depth}, no table: {elapsed:.2f}s")
+        table = TranspositionTable()
+        elapsed = benchmark(states, depth, table)
+        print(f"depth {depth},    table: {elapsed:.2f}s ({table})")